@@ -0,0 +1,273 @@
+"""Batch validation of a folder of input files, with reading, validation and writing overlapped."""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from Text_PreProc import READERS, load_table
+from main import validate_frame, write_output
+from Result_Cache import ResultCache
+from Tracing import Tracer
+from Config import Output_Folder, Result_Cache_Folder, Result_Cache_Max_Bytes
+
+# Loaded sheets waiting for a validation worker; bounds the sheets read ahead
+QUEUE_SIZE = 2
+
+MANIFEST_FILE = "manifest.json"
+
+# End of a stage's queue
+_DONE = object()
+
+
+def find_inputs(source):
+    """
+    List the input files of a batch.
+
+    Args:
+        source (str): Directory (its .xlsx, .csv and .parquet files, not recursive)
+            or glob pattern, e.g. "Input/**/*.xlsx".
+
+    Returns:
+        list: Input paths, sorted; Excel lock files ("~$name.xlsx") are skipped.
+    """
+    path = Path(source)
+    candidates = path.iterdir() if path.is_dir() else map(Path, glob.glob(source, recursive=True))
+    return sorted(
+        candidate for candidate in candidates
+        if candidate.is_file() and candidate.suffix.lower() in READERS and not candidate.name.startswith("~$")
+    )
+
+
+def output_paths(inputs, output_dir, suffix=".xlsx"):
+    """
+    Name the output of each input file "<stem>_processed<suffix>" in ``output_dir``,
+    numbering inputs whose stems repeat (e.g. the same name in two folders).
+
+    Returns:
+        list: Output paths, in ``inputs`` order.
+    """
+    seen = {}
+    outputs = []
+    for input_file in inputs:
+        stem = input_file.stem
+        seen[stem] = seen.get(stem, 0) + 1
+        if seen[stem] > 1:
+            stem = f"{stem}_{seen[stem]}"
+        outputs.append(Path(output_dir) / f"{stem}_processed{suffix}")
+    return outputs
+
+
+def issue_counts(results):
+    """
+    Count the flagged cells of one file by category.
+
+    Args:
+        results (tuple): Results of validate_frame.
+
+    Returns:
+        dict: Cells flagged by the logical, pattern and data type checks, and rows
+            flagged as duplicates.
+    """
+    pattern_issues, _, logical_indices, _, dtype_indices, _, _ = results
+    return {
+        "logical": sum(len(rows) for col, rows in logical_indices.items() if col != "Duplicates"),
+        "pattern": sum(len(rows) for rows in pattern_issues.values()),
+        "dtype": sum(len(rows) for rows in dtype_indices.values()),
+        "duplicates": len(logical_indices.get("Duplicates", []))
+    }
+
+
+def _stage_seconds(tracer):
+    # Wall time of each top-level span of a tracer, by span name
+    return {span.name: span.duration for span in tracer.spans}
+
+
+def _validate_job(df, split_rows=None, result_cache=None):
+    # Runs in a pool process: validate one loaded sheet, with the stage times
+    tracer = Tracer()
+    results = validate_frame(df, split_rows=split_rows, tracer=tracer, result_cache=result_cache)
+    return results, _stage_seconds(tracer)
+
+
+def _read_files(jobs, loaded, columns=None, arrow_strings=False):
+    # Reader thread: load each input in order; a failed read passes on its error
+    for entry in jobs:
+        entry["_start"] = time.time()
+        tracer = Tracer()
+        try:
+            with tracer.span("load") as span:
+                df = load_table(entry["input"], columns=columns, arrow_strings=arrow_strings)
+                span.set(rows=len(df))
+        except Exception as e:
+            df = None
+            entry["error"] = f"read failed: {e}"
+        entry["seconds"].update(_stage_seconds(tracer))
+        loaded.put((entry, df))
+    loaded.put(_DONE)
+
+
+def _write_file(entry, df, results):
+    # Write one file's output and record its counts in its manifest entry
+    tracer = Tracer()
+    output_file = Path(entry["output"])
+    entry["cells"] = write_output(df, results, output_file, len(df), tracer=tracer)
+    entry["seconds"].update(_stage_seconds(tracer))
+    entry.update(rows=len(df), columns=len(df.columns), issues=issue_counts(results),
+                 bytes_written=output_file.stat().st_size)
+
+
+def _write_outputs(pending, n_files):
+    # Writer thread: write each file's output as its validation finishes, in input order
+    done = 0
+    while True:
+        item = pending.get()
+        if item is _DONE:
+            return
+        entry, df, future = item
+        if future is not None:
+            try:
+                results, seconds = future.result()
+            except Exception as e:
+                entry["error"] = f"validation failed: {e}"
+            else:
+                entry["seconds"].update(seconds)
+                try:
+                    _write_file(entry, df, results)
+                except Exception as e:
+                    entry["error"] = f"write failed: {e}"
+        del df, item
+        entry["status"] = "error" if entry["error"] else "ok"
+        entry["seconds"]["total"] = time.time() - entry.pop("_start")
+        done += 1
+        if entry["status"] == "ok":
+            print(f"[{done}/{n_files}] {entry['input']} -> {entry['output']} "
+                  f"({entry['rows']} rows, {entry['cells']} flagged cells, {entry['seconds']['total']:.1f} s)")
+        else:
+            print(f"[{done}/{n_files}] Error: {entry['input']}: {entry['error']}")
+
+
+def run_batch(inputs, output_dir, suffix=".xlsx", workers=None, queue_size=QUEUE_SIZE, columns=None,
+              arrow_strings=False, split_rows=None, result_cache=None, manifest_file=None):
+    """
+    Validate many input files, overlapping reading, validation and writing.
+
+    A reader thread loads the files in order, a process pool validates the
+    loaded sheets and a writer thread writes each output as its results come
+    back, in input order. Stages hand files on through bounded queues: at most
+    ``queue_size`` sheets are read ahead of the pool and ``workers`` sheets
+    wait on it, so memory stays bounded however many files there are. A file
+    that fails is recorded in the manifest and the batch moves on.
+
+    Args:
+        inputs (list): Input file paths, e.g. from find_inputs.
+        output_dir (str): Directory for the outputs and the manifest.
+        suffix (str): Output type: ".xlsx" for recolored workbooks, ".csv" or
+            ".parquet" for issue reports.
+        workers (int, optional): Validation processes; defaults to the CPU count.
+        queue_size (int): Loaded sheets held ahead of the validation workers.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+        split_rows (int, optional): Rows per chunk for map-reduce counting within a column.
+        result_cache (ResultCache, optional): Per-column results of earlier runs,
+            shared by the workers.
+        manifest_file (str, optional): Manifest path; defaults to manifest.json in output_dir.
+
+    Returns:
+        dict: The manifest: settings, totals and one entry per file with its output,
+            status, stage times in seconds, row and column counts and issue counts.
+    """
+    workers = workers or os.cpu_count() or 1
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = Path(manifest_file) if manifest_file else output_dir / MANIFEST_FILE
+    started = datetime.now(timezone.utc)
+    start = time.time()
+
+    jobs = [
+        {"input": str(input_file), "output": str(output_file), "status": None, "error": None, "seconds": {}}
+        for input_file, output_file in zip(inputs, output_paths(inputs, output_dir, suffix))
+    ]
+    loaded = queue.Queue(maxsize=queue_size)
+    pending = queue.Queue(maxsize=workers)
+    print(f"Processing {len(jobs)} files with {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers before the threads, so none is forked mid-read
+        pool.submit(int).result()
+        reader = threading.Thread(target=_read_files, args=(jobs, loaded, columns, arrow_strings), daemon=True)
+        writer = threading.Thread(target=_write_outputs, args=(pending, len(jobs)), daemon=True)
+        reader.start()
+        writer.start()
+        while True:
+            item = loaded.get()
+            if item is _DONE:
+                break
+            entry, df = item
+            future = None
+            if df is not None:
+                try:
+                    future = pool.submit(_validate_job, df, split_rows, result_cache)
+                except BrokenExecutor as e:
+                    entry["error"] = f"validation failed: {e}"
+            pending.put((entry, df, future))
+            del item, df
+        pending.put(_DONE)
+        reader.join()
+        writer.join()
+
+    ok = [entry for entry in jobs if entry["status"] == "ok"]
+    manifest = {
+        "started": started.isoformat(timespec="seconds"),
+        "seconds": time.time() - start,
+        "workers": workers,
+        "queue_size": queue_size,
+        "files": len(jobs),
+        "succeeded": len(ok),
+        "failed": len(jobs) - len(ok),
+        "rows": sum(entry["rows"] for entry in ok),
+        "cells": sum(entry["cells"] for entry in ok),
+        "results": jobs
+    }
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"Processed {len(ok)}/{len(jobs)} files in {manifest['seconds']:.1f} seconds; manifest saved to {manifest_file}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="input directory or glob pattern, e.g. 'Input/**/*.xlsx'")
+    parser.add_argument("--output-dir", default=Output_Folder, help=f"output directory (default: {Output_Folder})")
+    parser.add_argument("--format", choices=["xlsx", "csv", "parquet"], default="xlsx",
+                        help="recolored workbooks (xlsx) or issue reports (csv, parquet)")
+    parser.add_argument("--workers", type=int, help="validation processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="loaded sheets held ahead of the workers")
+    parser.add_argument("--columns", nargs="+", help="only read these columns")
+    parser.add_argument("--arrow-strings", action="store_true", help="store text columns as Arrow-backed strings")
+    parser.add_argument("--split-rows", type=int, help="rows per chunk for counting within a column")
+    parser.add_argument("--cache", action="store_true", help=f"reuse per-column results from {Result_Cache_Folder}")
+    parser.add_argument("--manifest", help=f"manifest file (default: <output-dir>/{MANIFEST_FILE})")
+    args = parser.parse_args()
+
+    inputs = find_inputs(args.source)
+    if not inputs:
+        print(f"Error: no {', '.join(READERS)} files found in '{args.source}'!")
+        return 1
+    result_cache = ResultCache(Result_Cache_Folder, Result_Cache_Max_Bytes) if args.cache else None
+    manifest = run_batch(
+        inputs, args.output_dir, suffix=f".{args.format}", workers=args.workers, queue_size=args.queue_size,
+        columns=args.columns, arrow_strings=args.arrow_strings, split_rows=args.split_rows,
+        result_cache=result_cache, manifest_file=args.manifest
+    )
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
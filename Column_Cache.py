@@ -0,0 +1,237 @@
+"""Per-run cache of typed column conversions shared by the validators."""
+
+import re
+import warnings
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+
+# Arrow-backed string dtype of the arrow_strings mode
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+
+def is_arrow_string(series):
+    """Return True if ``series`` holds Arrow-backed strings (string[pyarrow])."""
+    return isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "pyarrow"
+
+
+def as_text(series):
+    """
+    Convert a column to strings, like ``series.astype(str)``.
+
+    Arrow-backed string columns stay Arrow-backed, with missing values as
+    "nan" as astype(str) gives for object columns. Whole numbers in float
+    columns (integer cells widened by blanks) print as ints, e.g.
+    "8193922929" rather than "8193922929.0", so a cell's text does not
+    depend on the other cells of its column or batch.
+
+    Args:
+        series (pd.Series): Raw column values.
+
+    Returns:
+        pd.Series: String values.
+    """
+    if is_arrow_string(series):
+        return series.fillna("nan")
+    text = series.astype(str)
+    if series.dtype.kind == "f":
+        values = series.to_numpy()
+        integral = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2.0 ** 63)
+        if integral.any():
+            text = text.to_numpy(dtype=object)
+            text[integral] = values[integral].astype(np.int64).astype(str)
+            text = pd.Series(text, index=series.index, name=series.name, dtype=object)
+    return text
+
+
+# List-like wrapper around a date, e.g. "['12-03-1990']"
+_WRAPPED_DATE_RE = re.compile(r"^\['([^']+)'\]")
+
+# Distinct values sampled to infer date formats
+DATE_SAMPLE_SIZE = 200
+
+# pandas warns whenever a guess does not honour dayfirst, e.g. for year-first
+# dates; filtered once here, as catch_warnings is not safe in threads
+warnings.filterwarnings("ignore", message="Parsing dates in .* format when dayfirst=True", category=UserWarning)
+
+
+def clean_dates(series):
+    """
+    Unwrap list-like date strings such as "['12-03-1990']"; blanks become NA.
+
+    Args:
+        series (pd.Series): Raw column values.
+
+    Returns:
+        pd.Series: Stripped date strings, NA for blank cells.
+    """
+    blank = series.isna() | (series == "") | (series == "[]")
+    text = as_text(series[~blank]).str.strip()
+    unwrapped = text.str.extract(_WRAPPED_DATE_RE, expand=False)
+    cleaned = pd.Series(pd.NA, index=series.index, dtype=object)
+    cleaned[~blank] = unwrapped.where(unwrapped.notna(), text)
+    return cleaned
+
+
+def _guess_date_format(value, dayfirst=True):
+    """Guess the strftime format of a date string; None if it has no single format."""
+    fmt = guess_datetime_format(value, dayfirst=dayfirst)
+    # dayfirst only applies when the year comes last; year-first dates are Y-m-d
+    if fmt is not None and dayfirst and fmt.startswith("%Y"):
+        fmt = guess_datetime_format(value, dayfirst=False)
+    if fmt is not None and dayfirst and not fmt.startswith("%Y") and 0 <= fmt.find("%m") < fmt.find("%d"):
+        return None  # Month-first, e.g. "12-25-2000"; leave it to the dayfirst parser
+    return fmt
+
+
+def infer_date_formats(values, dayfirst=True, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Infer the formats of date strings from a sample of them.
+
+    Args:
+        values (np.ndarray): Distinct date strings.
+        dayfirst (bool): Read ambiguous dates as DD-MM-YYYY.
+        sample_size (int): Number of values to sample, evenly spread.
+
+    Returns:
+        list: strftime formats, most common first.
+    """
+    step = max(1, len(values) // sample_size)
+    counts = Counter(_guess_date_format(value, dayfirst) for value in values[::step])
+    counts.pop(None, None)
+    return [fmt for fmt, _ in counts.most_common()]
+
+
+def _parse_distinct_dates(values, dayfirst=True):
+    """Parse distinct date strings: one explicit-format pass per inferred format, then the rest one by one."""
+    parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    remaining = np.arange(len(values))
+    for fmt in infer_date_formats(values, dayfirst):
+        if not len(remaining):
+            break
+        converted = pd.to_datetime(values[remaining], format=fmt, errors="coerce")
+        ok = ~np.asarray(converted.isna())
+        parsed[remaining[ok]] = converted[ok]
+        remaining = remaining[~ok]
+    # Leftovers, e.g. rare formats or invalid values, take the slow path
+    if len(remaining):
+        converted = pd.to_datetime(values[remaining], format="mixed", dayfirst=dayfirst, errors="coerce")
+        parsed[remaining] = converted
+    return parsed
+
+
+def parse_dates(series, dayfirst=True):
+    """
+    Parse a date column the way every validator should interpret it.
+
+    Each distinct value is parsed once. Formats are inferred from a sample of
+    the values and each format group is parsed with an explicit format;
+    values matching none of them go through pandas' per-value parser.
+
+    Args:
+        series (pd.Series): Raw column values.
+        dayfirst (bool): Parse ambiguous dates as DD-MM-YYYY.
+
+    Returns:
+        tuple: (cleaned, parsed) where cleaned holds the unwrapped strings (NA for
+            blanks) and parsed the datetimes (NaT where parsing failed).
+    """
+    codes, uniques = pd.factorize(series)
+    # Clean and parse each distinct raw value once; code -1 (blank) picks the trailing NA/NaT
+    cleaned = clean_dates(pd.Series(uniques, dtype=object))
+    values = cleaned.dropna()
+    parsed = np.full(len(uniques) + 1, np.datetime64("NaT"), dtype="datetime64[ns]")
+    parsed[values.index] = _parse_distinct_dates(values.to_numpy(dtype=object), dayfirst)
+    cleaned = np.append(cleaned.to_numpy(dtype=object), pd.NA)
+    return (
+        pd.Series(cleaned[codes], index=series.index, name=series.name, dtype=object),
+        pd.Series(parsed[codes], index=series.index, name=series.name)
+    )
+
+
+def parse_numbers(series):
+    """
+    Coerce a column to numbers, with NaN where a value is not numeric.
+
+    Args:
+        series (pd.Series): Raw column values.
+
+    Returns:
+        pd.Series: Numeric values.
+    """
+    numbers = pd.to_numeric(series, errors='coerce')
+    if isinstance(numbers.dtype, pd.api.extensions.ExtensionDtype):
+        # Arrow-backed strings parse to nullable numbers; use NaN like object columns
+        numbers = pd.Series(numbers.to_numpy(dtype="float64", na_value=np.nan), index=series.index, name=series.name)
+    return numbers
+
+
+def split_lists(series, sep="|"):
+    """
+    Split separator-delimited values (e.g. several phone numbers in one cell)
+    into one item per row.
+
+    Args:
+        series (pd.Series): Raw column values.
+        sep (str): Separator between items.
+
+    Returns:
+        pd.Series: Raw items as strings, indexed by the label of the row they
+            came from, in row order; blank cells have no items.
+    """
+    present = series.notna() & (series != "")
+    if is_arrow_string(series):
+        # Split and flatten in Arrow, keeping the items Arrow-backed
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        values = series[present]
+        lists = pc.split_pattern(pa.array(values.array), sep)
+        return pd.Series(
+            pd.array(pc.list_flatten(lists), dtype=ARROW_STRING),
+            index=values.index[pc.list_parent_indices(lists).to_numpy()],
+            name=series.name
+        )
+    return as_text(series[present]).str.split(sep, regex=False).explode()
+
+
+class ColumnCache:
+    """
+    Typed conversions of a DataFrame's columns, each computed at most once.
+
+    Conversions are keyed by (column, target type, parse options), so
+    Logical and Data_Type read the same parsed values for a column.
+    """
+
+    PARSERS = {
+        "date": parse_dates,
+        "numeric": parse_numbers,
+        "items": split_lists
+    }
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    def get(self, col, kind, **options):
+        """
+        Return column ``col`` converted to ``kind``, parsing it on first use.
+
+        Args:
+            col (str): Column name.
+            kind (str): Target type, one of PARSERS.
+            **options: Parse options passed to the parser.
+
+        Returns:
+            The parser's result for the column.
+        """
+        key = (col, kind, tuple(sorted(options.items())))
+        if key not in self._columns:
+            self._columns[key] = self.PARSERS[kind](self.df[col], **options)
+        return self._columns[key]
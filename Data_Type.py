@@ -1,156 +1,151 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import re
-
-def dtype(df, expected_dtypes, matched_cols=None):
-    """
-    Validate data types for columns based on expected types and return error indices and row-wise issues.
-    
-    Args:
-        df (pd.DataFrame): Input DataFrame
-        expected_dtypes (dict): Dictionary of expected column names and their data types
-        matched_cols (dict): Mapping of expected column names to actual column names
-        
-    Returns:
-        tuple: (error_indices, row_issues)
-            - error_indices: dict mapping column names to lists of row indices with errors
-            - row_issues: dict mapping row indices to lists of issue descriptions
-    """
-    error_indices = {col: [] for col in matched_cols.values()} if matched_cols else {}
-    row_issues = {}
-
-    if not matched_cols:
-        return error_indices, row_issues
-
-    for expected_col, actual_col in matched_cols.items():
-        if expected_col in expected_dtypes:
-            expected_type = expected_dtypes[expected_col]
-
-            # DATE: Check for valid date format
-            if expected_type == "date":
-                # Preprocess to handle list-like strings
-                def clean_date(value):
-                    if pd.isna(value) or value == "" or value == "[]":
-                        return pd.NA
-                    str_val = str(value).strip()
-                    match = re.match(r"\['([^']+)'\]", str_val)
-                    if match:
-                        return match.group(1)
-                    return str_val
-
-                cleaned_series = df[actual_col].apply(clean_date)
-                # Use default parsing with dayfirst=True to handle DD-MM-YYYY
-                converted = pd.to_datetime(cleaned_series, errors='coerce', dayfirst=True)
-                invalid = converted.isna() & cleaned_series.notna()
-                error_indices[actual_col] = df.index[invalid].tolist()
-                issues = np.where(invalid, "Invalid date format", "")
-                index = 0
-                while index < len(issues):
-                    if issues[index]:
-                        row_issues[index] = row_issues.get(index, []) + [issues[index]]
-                    index += 1
-
-            # NUMERIC: Check for numeric values, including pipe-separated phone numbers
-            elif expected_type == "numeric":
-                if expected_col == "Age":
-                    def is_valid_age(value):
-                        if pd.isna(value) or value == "":
-                            return True
-                        try:
-                            num = float(str(value))
-                            return num.is_integer() and isinstance(num, (int, float))
-                        except (ValueError, TypeError):
-                            return False
-                    
-                    invalid = df[actual_col].apply(lambda x: not is_valid_age(x))
-                    error_indices[actual_col] = df.index[invalid].tolist()
-                    issues = np.where(invalid, "Age must be a whole number", "")
-                    index = 0
-                    while index < len(issues):
-                        if issues[index]:
-                            row_issues[index] = row_issues.get(index, []) + [issues[index]]
-                        index += 1
-                else:
-                    def is_numeric_list(value):
-                        if pd.isna(value) or value == "":
-                            return True
-                        return all(part.strip().replace(r"[^\d]", "").isnumeric() for part in str(value).split("|"))
-                    
-                    invalid = df[actual_col].apply(lambda x: not is_numeric_list(x))
-                    error_indices[actual_col] = df.index[invalid].tolist()
-                    issues = np.where(invalid, "Non-numeric value in phone list", "")
-                    index = 0
-                    while index < len(issues):
-                        if issues[index]:
-                            row_issues[index] = row_issues.get(index, []) + [issues[index]]
-                        index += 1
-
-            # TEXT: Check for non-empty strings
-            elif expected_type == "text":
-                cleaned = df[actual_col].astype(str).str.strip()
-                invalid = (cleaned == "") & (df[actual_col].notna())
-                error_indices[actual_col] = df.index[invalid].tolist()
-                issues = np.where(invalid, "Empty or whitespace text", "")
-                index = 0
-                while index < len(issues):
-                    if issues[index]:
-                        row_issues[index] = row_issues.get(index, []) + [issues[index]]
-                    index += 1
-
-            # EMAIL: Check for basic email format, including pipe-separated emails
-            elif expected_type == "email":
-                def is_valid_email_list(value):
-                    if pd.isna(value) or value == "":
-                        return True
-                    emails = str(value).split("|")
-                    return all(re.match(r"^[^@]+@[^@]+\.[^@]+$", email.strip()) for email in emails)
-                
-                invalid = df[actual_col].apply(lambda x: not is_valid_email_list(x))
-                error_indices[actual_col] = df.index[invalid].tolist()
-                issues = np.where(invalid, "Invalid email format in list", "")
-                index = 0
-                while index < len(issues):
-                    if issues[index]:
-                        row_issues[index] = row_issues.get(index, []) + [issues[index]]
-                    index += 1
-
-    return error_indices, row_issues
-
-if __name__ == "__main__":
-    # Update expected_dtypes to include Age
-    expected_dtypes = {
-        "DOB": "date",
-        "Phone": "numeric",
-        "pan": "text",
-        "DOD": "date",
-        "Address": "text",
-        "Email": "text",
-        "Age": "numeric"
-    }
-    
-    # Test data including Age
-    data = {
-        "DOB": ["['2000-05-12']", "['03-08-1968']", "['30-07-1927']", "[]", "invalid"],
-        "Phone": ["9876543210", "9441924126|9701346831", "12345", "abcdefghij", "9999999999"],
-        "pan": ["ABCDE1234X", "1234567890", "", "SHORT123", None],
-        "DOD": ["2023-12-12", "invalid_date", None, "2010-06-10", "1999-01-01"],
-        "Address": ["123 Street", "Apt", "    ", "Some Place", ""],
-        "Email": ["user1@example.com", "arjunavalasasachivalayam@gmail.com|malleswararodalli1@gmail.com", "no@at", "user2@example.com", "test@domain.co"],
-        "Age": [25, 30, "25.5", "abc", 45]  # Added Age column with various test cases
-    }
-    
-    df = pd.DataFrame(data)
-    matched_cols = {
-        "DOB": "DOB",
-        "Phone": "Phone",
-        "pan": "pan",
-        "DOD": "DOD",
-        "Address": "Address",
-        "Email": "Email",
-        "Age": "Age"
-    }
-    
-    error_indices, row_issues = dtype(df, expected_dtypes, matched_cols=matched_cols)
-    print("\nData Type Error Indices:", error_indices)
-    print("\nRow-wise Data Type Issues:", row_issues)
\ No newline at end of file
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import re
+from Column_Cache import ColumnCache, as_text
+from Issue_Store import IssueStore
+
+_EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+def dtype_column(expected_col, expected_type, series, cache=None):
+    """
+    Validate the data type of one matched column.
+    
+    Args:
+        expected_col (str): Expected column name the column was matched to
+        expected_type (str): Expected data type ("date", "numeric", "text" or "email")
+        series (pd.Series): Column values, named after the actual column
+        cache (ColumnCache): Typed conversions shared with Logical; created if not given
+        
+    Returns:
+        tuple or None: (invalid, issue) with a boolean mask of invalid rows and the issue
+            description, or None if the type has no check
+    """
+    if cache is None:
+        cache = ColumnCache(series.to_frame())
+    actual_col = series.name
+
+    # DATE: Check for valid date format
+    if expected_type == "date":
+        # List-like strings are unwrapped and DD-MM-YYYY is parsed dayfirst,
+        # shared with Logical through the column cache
+        cleaned_series, converted = cache.get(actual_col, "date", dayfirst=True)
+        invalid = converted.isna() & cleaned_series.notna()
+        return invalid, "Invalid date format"
+
+    # NUMERIC: Check for numeric values, including pipe-separated phone numbers
+    if expected_type == "numeric":
+        if expected_col == "Age":
+            age = cache.get(actual_col, "numeric")
+            blank = series.isna() | (series == "")
+            invalid = ~blank & ~(age.notna() & (age % 1 == 0))
+            return invalid, "Age must be a whole number"
+
+        # A row is invalid if any of its pipe-separated items is not numeric
+        items = cache.get(actual_col, "items")
+        numeric = items.str.strip().str.replace(r"[^\d]", "", regex=False).str.isnumeric().astype(bool)
+        invalid = pd.Series(series.index.isin(items.index[~numeric]), index=series.index)
+        return invalid, "Non-numeric value in phone list"
+
+    # TEXT: Check for non-empty strings
+    if expected_type == "text":
+        cleaned = as_text(series).str.strip()
+        invalid = (cleaned == "") & (series.notna())
+        return invalid, "Empty or whitespace text"
+
+    # EMAIL: Check for basic email format, including pipe-separated emails
+    if expected_type == "email":
+        items = cache.get(actual_col, "items")
+        valid = items.str.strip().str.fullmatch(_EMAIL_RE.pattern).astype(bool)
+        invalid = pd.Series(series.index.isin(items.index[~valid]), index=series.index)
+        return invalid, "Invalid email format in list"
+
+    return None
+
+def merge_dtype_results(index, matched_cols, results):
+    """
+    Build error indices and row-wise issues from per-column results.
+    
+    Args:
+        index (pd.Index): Row index of the validated DataFrame
+        matched_cols (dict): Mapping of expected column names to actual column names
+        results (list): dtype_column result for each matched column, in matched_cols order
+        
+    Returns:
+        tuple: (error_indices, row_issues), as returned by dtype
+    """
+    error_indices = {col: [] for col in matched_cols.values()} if matched_cols else {}
+    row_issues = IssueStore()
+    for actual_col, result in zip(matched_cols.values(), results):
+        if result is None:
+            continue
+        invalid, issue = result
+        invalid = np.asarray(invalid, dtype=bool)
+        error_indices[actual_col] = index[invalid].tolist()
+        row_issues.add(index[invalid], issue, column=actual_col)
+    return error_indices, row_issues
+
+def dtype(df, expected_dtypes, matched_cols=None, cache=None):
+    """
+    Validate data types for columns based on expected types and return error indices and row-wise issues.
+    
+    Args:
+        df (pd.DataFrame): Input DataFrame
+        expected_dtypes (dict): Dictionary of expected column names and their data types
+        matched_cols (dict): Mapping of expected column names to actual column names
+        cache (ColumnCache): Typed conversions of ``df`` shared with Logical; created if not given
+        
+    Returns:
+        tuple: (error_indices, row_issues)
+            - error_indices: dict mapping column names to lists of row indices with errors
+            - row_issues: IssueStore of issue descriptions by row index label
+    """
+    if not matched_cols:
+        return merge_dtype_results(df.index, {}, [])
+    if cache is None:
+        cache = ColumnCache(df)
+
+    results = [
+        dtype_column(expected_col, expected_dtypes[expected_col], df[actual_col], cache)
+        if expected_col in expected_dtypes else None
+        for expected_col, actual_col in matched_cols.items()
+    ]
+    return merge_dtype_results(df.index, matched_cols, results)
+
+if __name__ == "__main__":
+    # Update expected_dtypes to include Age
+    expected_dtypes = {
+        "DOB": "date",
+        "Phone": "numeric",
+        "pan": "text",
+        "DOD": "date",
+        "Address": "text",
+        "Email": "text",
+        "Age": "numeric"
+    }
+    
+    # Test data including Age
+    data = {
+        "DOB": ["['2000-05-12']", "['03-08-1968']", "['30-07-1927']", "[]", "invalid"],
+        "Phone": ["9876543210", "9441924126|9701346831", "12345", "abcdefghij", "9999999999"],
+        "pan": ["ABCDE1234X", "1234567890", "", "SHORT123", None],
+        "DOD": ["2023-12-12", "invalid_date", None, "2010-06-10", "1999-01-01"],
+        "Address": ["123 Street", "Apt", "    ", "Some Place", ""],
+        "Email": ["user1@example.com", "arjunavalasasachivalayam@gmail.com|malleswararodalli1@gmail.com", "no@at", "user2@example.com", "test@domain.co"],
+        "Age": [25, 30, "25.5", "abc", 45]  # Added Age column with various test cases
+    }
+    
+    df = pd.DataFrame(data)
+    matched_cols = {
+        "DOB": "DOB",
+        "Phone": "Phone",
+        "pan": "pan",
+        "DOD": "DOD",
+        "Address": "Address",
+        "Email": "Email",
+        "Age": "Age"
+    }
+    
+    error_indices, row_issues = dtype(df, expected_dtypes, matched_cols=matched_cols)
+    print("\nData Type Error Indices:", error_indices)
+    print("\nRow-wise Data Type Issues:", row_issues.to_dict())
\ No newline at end of file
@@ -1,151 +1,386 @@
-"""Handles Excel file operations including loading, column matching, and coloring."""
-
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill
-from openpyxl.utils import get_column_letter
-from Config import COLORS
-
-
-def assign_colors(logical, pattern, dtype, colors, priorities):
-    """
-    Assign colors to cells based on issues and priorities, excluding 'Duplicates'.
-    """
-    cell_colors = {}
-    i = 0
-    logical_cols = list(logical.keys())
-    while i < len(logical_cols):
-        col = logical_cols[i]
-        if col != "Duplicates":
-            j = 0
-            while j < len(logical[col]):
-                row = logical[col][j]
-                key = (row, col)
-                if key not in cell_colors or priorities["logical"] > priorities.get(cell_colors[key][1], 0):
-                    cell_colors[key] = (colors["logical"], "logical")
-                j += 1
-        i += 1
-    
-    i = 0
-    while i < len(pattern):
-        col = list(pattern.keys())[i]
-        j = 0
-        while j < len(pattern[col]):
-            row = pattern[col][j]
-            key = (row, col)
-            if key not in cell_colors or priorities["pattern"] > priorities.get(cell_colors[key][1], 0):
-                cell_colors[key] = (colors["pattern"], "pattern")
-            j += 1
-        i += 1
-    
-    i = 0
-    while i < len(dtype):
-        col = list(dtype.keys())[i]
-        j = 0
-        while j < len(dtype[col]):
-            row = dtype[col][j]
-            key = (row, col)
-            if key not in cell_colors or priorities["dtype"] > priorities.get(cell_colors[key][1], 0):
-                cell_colors[key] = (colors["dtype"], "dtype")
-            j += 1
-        i += 1
-    
-    return {k: v[0] for k, v in cell_colors.items()}
-
-
-def apply_colors_to_excel(input_file, cell_colors, column_fill_ratios, output_file, logical_row_issues, pattern_row_issues, dtype_row_issues):
-    """
-    Applies colors to specific cells, adds Flag and Issues columns, and freezes the first two columns in an Excel file,
-    all in memory without creating a temporary file.
-    
-    Parameters:
-        input_file (str): Path to the input Excel file.
-        cell_colors (dict): Dictionary where keys are (row, column_name) tuples and values are hex color codes.
-        column_fill_ratios (dict): Dictionary where keys are column names and values are fill ratios.
-        output_file (str): Path to save the modified Excel file.
-        logical_row_issues (dict): Row-wise issues from Logical.py.
-        pattern_row_issues (dict): Row-wise issues from pattern.py (per column).
-        dtype_row_issues (dict): Row-wise issues from Data_Type.py.
-    """
-    # Load the original DataFrame
-    df = pd.read_excel(input_file)
-    
-    # Combine all row issues
-    all_issues = {}
-    for row_idx, issues in logical_row_issues.items():
-        all_issues[row_idx] = all_issues.get(row_idx, []) + issues
-    for col in pattern_row_issues:
-        for row_idx, issues in pattern_row_issues[col].items():
-            all_issues[row_idx] = all_issues.get(row_idx, []) + issues
-    for row_idx, issues in dtype_row_issues.items():
-        all_issues[row_idx] = all_issues.get(row_idx, []) + issues
-    
-    # Add Flag and Issues columns
-    df.insert(0, "Flag", True)  # Default to True (no issues)
-    df.insert(1, "Issues", "")
-    for row_idx in range(len(df)):
-        if row_idx in all_issues:
-            df.at[row_idx, "Flag"] = False
-            df.at[row_idx, "Issues"] = "; ".join(all_issues[row_idx])
-    
-    # Create a new workbook in memory
-    wb = Workbook()
-    ws = wb.active
-    
-    # Write headers
-    all_columns = df.columns.tolist()
-    for col_idx, col_name in enumerate(all_columns, 1):
-        ws.cell(row=1, column=col_idx, value=col_name)
-    
-    # Write data
-    for row_idx, row in enumerate(df.itertuples(index=False), 2):
-        for col_idx, value in enumerate(row, 1):
-            ws.cell(row=row_idx, column=col_idx, value=value)
-    
-    # Adjust cell_colors for column indices (since we added Flag and Issues)
-    adjusted_cell_colors = {}
-    for (row, col_name), color in cell_colors.items():
-        if col_name in all_columns:
-            col_idx = all_columns.index(col_name) + 1  # 1-based index
-            adjusted_cell_colors[(row, col_idx)] = color
-    
-    # Apply colors to specific cells
-    cell_keys = list(adjusted_cell_colors.keys())
-    i = 0
-    while i < len(cell_keys):
-        (row, col_idx) = cell_keys[i]
-        color = adjusted_cell_colors[(row, col_idx)]
-        cell = ws.cell(row=row + 2, column=col_idx)  # Adjust for header row
-        cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        i += 1
-    
-    # Apply color to column headers if fill ratio is below 50%
-    column_keys = list(column_fill_ratios.keys())
-    j = 0
-    while j < len(column_keys):
-        col_name = column_keys[j]
-        fill_ratio = column_fill_ratios[col_name]
-        if fill_ratio < 0.5 and col_name in all_columns:
-            col_idx = all_columns.index(col_name) + 1
-            header_cell = ws.cell(row=1, column=col_idx)
-            header_cell.fill = PatternFill(start_color=COLORS["fill"], end_color=COLORS["fill"], fill_type="solid")
-        j += 1
-    
-    # Freeze the first two columns (Flag and Issues)
-    ws.freeze_panes = "C2"  # Freezes columns A and B
-    
-    # Save the final file
-    wb.save(output_file)
-    print(f"Saved file with colored cells, headers, and frozen columns: {output_file}")
-
-
-if __name__ == "__main__":
-    input_file = "sample.xlsx"
-    output_file = "sample_processed.xlsx"
-    logical_row_issues = {0: ["DOB in future"], 1: ["Invalid phone"]}
-    pattern_row_issues = {"col1": {0: ["Low coverage pattern"]}, "col2": {2: ["Pattern issue"]}}
-    dtype_row_issues = {1: ["Invalid date format"]}
-    cell_colors = {(0, "col1"): "ea697e", (1, "col2"): "e1ea69"}
-    column_fill_ratios = {"col1": 0.4, "col2": 0.6}
-    
+"""Handles Excel file operations including loading, column matching, and coloring."""
+
+import pandas as pd
+import numpy as np
+from itertools import chain
+from pathlib import Path
+from Config import COLORS, PRIORITIES
+from Issue_Store import IssueStore, join_runs
+
+
+class CellColors:
+    """
+    Winning color of every cell, as a rows x columns int8 matrix of palette codes.
+
+    Code 0 means the cell is not colored; code k is colored ``palette[k]``,
+    the color of category ``categories[k]``.
+    """
+
+    def __init__(self, matrix, columns, palette, categories):
+        self.matrix = matrix
+        self.columns = list(columns)
+        self.palette = list(palette)
+        self.categories = list(categories)
+
+    def lookup(self, rows, columns):
+        """
+        Return the palette codes of the given cells.
+
+        Args:
+            rows (np.ndarray): Row positions.
+            columns (np.ndarray): Column names.
+
+        Returns:
+            np.ndarray: Code per cell, 0 for cells outside the matrix.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        positions = pd.Index(self.columns).get_indexer(pd.Index(columns, dtype=object))
+        inside = (positions >= 0) & (rows < self.matrix.shape[0])
+        codes = np.zeros(len(rows), dtype=self.matrix.dtype)
+        codes[inside] = self.matrix[rows[inside], positions[inside]]
+        return codes
+
+    def cells(self):
+        """
+        Return the colored cells, ordered by row.
+
+        Returns:
+            tuple: (rows, columns, codes) arrays, with ``columns`` indexing self.columns
+                and ``codes`` indexing self.palette.
+        """
+        rows, columns = np.nonzero(self.matrix)
+        return rows, columns, self.matrix[rows, columns]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.matrix))
+
+    def items(self):
+        """Yield ((row, column_name), color) for every colored cell."""
+        for row, col, code in zip(*(values.tolist() for values in self.cells())):
+            yield (row, self.columns[col]), self.palette[code]
+
+    def to_dict(self):
+        """Return the colors as {(row, column_name): color}."""
+        return dict(self.items())
+
+
+def rank_categories(names, priorities):
+    """
+    Order issue categories by priority, ties going to the category listed first.
+
+    Returns:
+        list: Category names from rank 1, the lowest priority, up; a higher rank wins a cell.
+    """
+    order = sorted(range(len(names)), key=lambda i: (priorities[names[i]], -i))
+    return [names[i] for i in order]
+
+
+def assign_colors(logical, pattern, dtype, colors, priorities):
+    """
+    Assign colors to cells based on issues and priorities, excluding 'Duplicates'.
+
+    Each category gets a rank by priority, ties going to the category listed
+    first (logical, pattern, dtype), and the winning rank per cell is kept in
+    a rows x columns int8 matrix with np.maximum, one column of row indices
+    at a time.
+
+    Returns:
+        CellColors: Winning color per cell.
+    """
+    categories = [
+        ("logical", {col: rows for col, rows in logical.items() if col != "Duplicates"}),
+        ("pattern", pattern),
+        ("dtype", dtype)
+    ]
+    ranked = rank_categories([name for name, _ in categories], priorities)
+    ranks = {name: np.int8(rank) for rank, name in enumerate(ranked, 1)}
+
+    columns = list(dict.fromkeys(col for _, indices in categories for col in indices))
+    col_positions = {col: j for j, col in enumerate(columns)}
+    row_arrays = [
+        (name, col_positions[col], np.asarray(rows, dtype=np.int64))
+        for name, indices in categories for col, rows in indices.items()
+    ]
+    n_rows = max((int(rows.max()) + 1 for _, _, rows in row_arrays if len(rows)), default=0)
+
+    matrix = np.zeros((n_rows, len(columns)), dtype=np.int8)
+    for name, j, rows in row_arrays:
+        matrix[rows, j] = np.maximum(matrix[rows, j], ranks[name])
+    return CellColors(matrix, columns, [None] + [colors[name] for name in ranked], [None] + ranked)
+
+
+class _Fills(dict):
+    """One shared PatternFill per color, created on first use."""
+
+    def __missing__(self, color):
+        from openpyxl.styles import PatternFill
+
+        fill = self[color] = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        return fill
+
+
+def _write_workbook(output_file, columns, rows, cell_colors, header_colors):
+    """
+    Write the sheet with a regular in-memory openpyxl workbook.
+    """
+    from openpyxl import Workbook
+
+    fills = _Fills()
+    wb = Workbook()
+    ws = wb.active
+    
+    # Write headers and data
+    ws.append(columns)
+    for row in rows:
+        ws.append(row)
+    
+    # Apply colors to specific cells
+    for row, col_idx, color in zip(*cell_colors):
+        ws.cell(row=row + 2, column=col_idx).fill = fills[color]  # Adjust for header row
+    
+    # Apply color to column headers
+    for col_idx, color in header_colors.items():
+        ws.cell(row=1, column=col_idx).fill = fills[color]
+    
+    # Freeze the first two columns (Flag and Issues)
+    ws.freeze_panes = "C2"  # Freezes columns A and B
+    wb.save(output_file)
+
+
+def _write_streaming(output_file, columns, rows, cell_colors, header_colors):
+    """
+    Write the sheet row by row with a write-only openpyxl workbook, in constant memory.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    fills = _Fills()
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    # Freeze the first two columns (Flag and Issues)
+    ws.freeze_panes = "C2"  # Freezes columns A and B
+
+    def styled(value, color):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.fill = fills[color]
+        return cell
+
+    header = list(columns)
+    for col_idx, color in header_colors.items():
+        header[col_idx - 1] = styled(header[col_idx - 1], color)
+    ws.append(header)
+    # Cell colors are ordered by row, so they are consumed alongside the rows
+    cells = zip(*cell_colors)
+    cell = next(cells, None)
+    for row_idx, row in enumerate(rows):
+        if cell is not None and cell[0] == row_idx:
+            row = list(row)
+            while cell is not None and cell[0] == row_idx:
+                _, col_idx, color = cell
+                row[col_idx - 1] = styled(row[col_idx - 1], color)
+                cell = next(cells, None)
+        ws.append(row)
+    wb.save(output_file)
+
+
+# Writer backends: name -> function(output_file, columns, rows, cell_colors, header_colors),
+# where cell_colors holds lists of 0-based data rows, 1-based columns and hex colors, ordered by row
+WRITERS = {
+    "openpyxl": _write_workbook,
+    "write_only": _write_streaming
+}
+
+
+def _issue_columns(issue_rows, issue_text, start, n_rows):
+    """Build the Flag and Issues values of rows start..start + n_rows from IssueStore.issue_text."""
+    lo, hi = np.searchsorted(issue_rows, [start, start + n_rows])
+    issues = np.full(n_rows, "", dtype=object)
+    issues[issue_rows[lo:hi] - start] = issue_text[lo:hi]
+    return issues == "", issues  # Flag is True for rows without issues
+
+
+def _with_issue_columns(batches, all_issues):
+    """Yield data rows prefixed with their Flag and Issues values, by row position."""
+    issue_rows, issue_text = all_issues.issue_text()
+    start = 0
+    for batch in batches:
+        flags, issues = _issue_columns(issue_rows, issue_text, start, len(batch))
+        if any(isinstance(dtype, pd.StringDtype) for dtype in batch.dtypes):
+            # Missing Arrow-backed strings are pd.NA, which openpyxl cannot write
+            batch = batch.astype(object).where(batch.notna(), None)
+        for flag, issue, row in zip(flags.tolist(), issues.tolist(), batch.itertuples(index=False)):
+            yield (flag, issue) + tuple(row)
+        start += len(batch)
+
+
+def apply_colors_to_excel(source, cell_colors, column_fill_ratios, output_file, logical_row_issues, pattern_row_issues, dtype_row_issues, writer="openpyxl"):
+    """
+    Applies colors to specific cells, adds Flag and Issues columns, and freezes the first two columns in an Excel file,
+    all in memory without creating a temporary file.
+    
+    Parameters:
+        source (pd.DataFrame, iterable or str): The already-loaded DataFrame, an iterable of
+            consecutive row batches, or a path to an Excel file to read.
+        cell_colors (CellColors): Winning color per cell, from assign_colors.
+        column_fill_ratios (dict): Dictionary where keys are column names and values are fill ratios.
+        output_file (str): Path to save the modified Excel file.
+        logical_row_issues (IssueStore): Row-wise issues from Logical.py.
+        pattern_row_issues (dict): Row-wise issues from pattern.py (IssueStore per column).
+        dtype_row_issues (IssueStore): Row-wise issues from Data_Type.py.
+        writer (str): Writer backend from WRITERS; "write_only" streams rows in constant memory.
+    """
+    write = WRITERS[writer]
+
+    # Use the data already loaded by the caller; only read the file when given a path
+    if isinstance(source, pd.DataFrame):
+        batches = iter([source])
+    elif isinstance(source, (str, Path)):
+        batches = iter([pd.read_excel(source)])
+    else:
+        batches = iter(source)
+    first = next(batches, None)
+    columns = []
+    if first is not None:
+        columns = first.columns.tolist()
+        batches = chain([first], batches)
+    
+    # Combine all row issues
+    all_issues = IssueStore.concat([logical_row_issues, *pattern_row_issues.values(), dtype_row_issues])
+    
+    # Add Flag and Issues columns
+    all_columns = ["Flag", "Issues"] + columns
+    
+    # Adjust cell_colors for column indices (since we added Flag and Issues)
+    col_positions = {}
+    for col_idx, col_name in enumerate(all_columns, 1):
+        col_positions.setdefault(col_name, col_idx)  # 1-based index
+    # Map the color matrix's columns to sheet columns, dropping unknown names
+    rows, cols, codes = cell_colors.cells()
+    sheet_cols = np.array([col_positions.get(col_name, 0) for col_name in cell_colors.columns], dtype=np.int64)[cols]
+    keep = sheet_cols > 0
+    adjusted_cell_colors = (
+        rows[keep].tolist(),
+        sheet_cols[keep].tolist(),
+        np.asarray(cell_colors.palette, dtype=object)[codes[keep]].tolist()
+    )
+    
+    # Color column headers if fill ratio is below 50%
+    header_colors = {}
+    for col_name, fill_ratio in column_fill_ratios.items():
+        if fill_ratio < 0.5 and col_name in col_positions:
+            header_colors[col_positions[col_name]] = COLORS["fill"]
+    
+    write(output_file, all_columns, _with_issue_columns(batches, all_issues), adjusted_cell_colors, header_colors)
+    print(f"Saved file with colored cells, headers, and frozen columns: {output_file}")
+
+
+
+# Columns of the issue report, one row per flagged cell
+REPORT_COLUMNS = ["row", "column", "category", "color", "message"]
+
+
+def issue_report(logical_row_issues, pattern_row_issues, dtype_row_issues, cell_colors, priorities=PRIORITIES, columns=None):
+    """
+    Build a table of the flagged cells, one row per cell, instead of a recolored workbook.
+
+    A cell's color and category are the ones it gets in the workbook, from
+    ``cell_colors``. Cells the workbook leaves uncolored, e.g. those only
+    flagged as duplicates, have no color, and their category is the highest
+    priority among their issues, ranked as in assign_colors. A cell's message
+    joins all of its issues with "; ", in the order of the Issues column.
+
+    Args:
+        logical_row_issues (IssueStore): Row-wise issues from Logical.py, with their columns.
+        pattern_row_issues (dict): Row-wise issues from pattern.py (IssueStore per column).
+        dtype_row_issues (IssueStore): Row-wise issues from Data_Type.py, with their columns.
+        cell_colors (CellColors): Winning color per cell, from assign_colors.
+        priorities (dict): Priority per category; higher wins.
+        columns (list, optional): Sheet column order, to sort cells within a row.
+
+    Returns:
+        pd.DataFrame: REPORT_COLUMNS, sorted by row and column.
+    """
+    names = ["logical", "pattern", "dtype"]
+    stores = [logical_row_issues, IssueStore(), dtype_row_issues]
+    for col, store in pattern_row_issues.items():
+        stores[1].extend(store, column=col)
+    ranked = rank_categories(names, priorities)
+    ranks = {name: rank for rank, name in enumerate(ranked, 1)}
+
+    cells = [store.cells() for store in stores]
+    rows = np.concatenate([store_rows for store_rows, _, _ in cells])
+    cols = np.concatenate([store_cols for _, store_cols, _ in cells])
+    messages = np.concatenate([store_messages for _, _, store_messages in cells])
+    cell_ranks = np.concatenate([np.full(len(store_rows), ranks[name], dtype=np.int8) for name, (store_rows, _, _) in zip(names, cells)])
+
+    # One key per cell, sorted by row then column; stable, so issues keep their order
+    col_codes, col_names = pd.factorize(pd.Series(cols, dtype=object))
+    if columns is not None:
+        sheet_order = pd.Index(list(dict.fromkeys([*columns, *col_names])))
+        col_codes = np.where(col_codes >= 0, sheet_order.get_indexer(col_names)[col_codes], -1)
+        col_names = sheet_order
+    col_names = np.asarray([*col_names, None], dtype=object)
+    keys = rows * len(col_names) + (col_codes + 1)
+    position = np.argsort(keys, kind="stable")
+    keys, messages, cell_ranks = keys[position], messages[position], cell_ranks[position]
+    cell_keys, text = join_runs(keys, messages)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+    winners = np.maximum.reduceat(cell_ranks, starts) if len(starts) else cell_ranks
+
+    # Workbook color of each cell; uncolored cells fall back to their issues' category
+    cell_rows = cell_keys // len(col_names)
+    cell_cols = col_names[cell_keys % len(col_names) - 1]
+    codes = cell_colors.lookup(cell_rows, cell_cols)
+    categories = np.where(
+        codes > 0,
+        np.asarray(cell_colors.categories, dtype=object)[codes],
+        np.asarray([None, *ranked], dtype=object)[winners]
+    )
+    return pd.DataFrame({
+        "row": cell_rows,
+        "column": cell_cols,
+        "category": categories,
+        "color": np.asarray(cell_colors.palette, dtype=object)[codes],
+        "message": text
+    }, columns=REPORT_COLUMNS)
+
+
+def _write_report_csv(report, output_file):
+    report.to_csv(output_file, index=False)
+
+
+def _write_report_parquet(report, output_file):
+    report.to_parquet(output_file, index=False)
+
+
+# Output file suffix -> issue report writer
+REPORT_WRITERS = {
+    ".csv": _write_report_csv,
+    ".parquet": _write_report_parquet
+}
+
+
+def write_issue_report(report, output_file):
+    """
+    Save an issue_report table as CSV or Parquet, picking the format by suffix.
+
+    Args:
+        report (pd.DataFrame): Table from issue_report.
+        output_file (str): Path ending in .csv or .parquet.
+    """
+    REPORT_WRITERS[Path(output_file).suffix.lower()](report, output_file)
+    print(f"Saved issue report with {len(report)} flagged cells: {output_file}")
+
+if __name__ == "__main__":
+    input_file = "sample.xlsx"
+    output_file = "sample_processed.xlsx"
+    logical_row_issues = IssueStore.from_dict({0: ["DOB in future"], 1: ["Invalid phone"]})
+    pattern_row_issues = {
+        "col1": IssueStore.from_dict({0: ["Low coverage pattern"]}),
+        "col2": IssueStore.from_dict({2: ["Pattern issue"]})
+    }
+    dtype_row_issues = IssueStore.from_dict({1: ["Invalid date format"]})
+    cell_colors = assign_colors({"col1": [0]}, {"col2": [1]}, {}, COLORS, PRIORITIES)
+    column_fill_ratios = {"col1": 0.4, "col2": 0.6}
+    
     apply_colors_to_excel(input_file, cell_colors, column_fill_ratios, output_file, logical_row_issues, pattern_row_issues, dtype_row_issues)
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Compact row-issue storage shared by the validators and the Excel writer."""
+
+import numpy as np
+import pandas as pd
+
+
+def join_runs(keys, messages, sep="; "):
+    """
+    Join messages that share a key, for keys grouped into consecutive runs.
+
+    Args:
+        keys (np.ndarray): Key of each message; equal keys must be adjacent.
+        messages (np.ndarray): Messages, as an object array.
+        sep (str): Separator between the messages of one key.
+
+    Returns:
+        tuple: (keys, text) with one entry per run, messages joined in order.
+    """
+    if not len(keys):
+        return keys, messages
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    text = messages[starts]
+    # Append the k-th message of every run that has more than k, one k at a time
+    for k in range(1, counts.max()):
+        more = counts > k
+        text[more] = text[more] + sep + messages[starts[more] + k]
+    return keys[starts], text
+
+
+class IssueStore:
+    """
+    Row issues as parallel arrays of row numbers and message codes.
+
+    Each distinct message is stored once in ``messages``; an issue is one
+    (row, code) entry. Entries keep the order they were added in, which is
+    the order a row's issues are listed in the Issues column. Issues may also
+    name the column they were found in, stored once in ``columns``.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self._message_codes = {}
+        self.columns = []
+        self._column_codes = {}
+        self._rows = []
+        self._codes = []
+        self._cols = []
+
+    def intern(self, message):
+        """Return the code of ``message``, adding it to the message table if new."""
+        code = self._message_codes.get(message)
+        if code is None:
+            code = self._message_codes[message] = len(self.messages)
+            self.messages.append(message)
+        return code
+
+    def _intern_column(self, column):
+        # Column code of ``column``; -1 for issues not tied to a column
+        if column is None:
+            return -1
+        code = self._column_codes.get(column)
+        if code is None:
+            code = self._column_codes[column] = len(self.columns)
+            self.columns.append(column)
+        return code
+
+    def _append(self, rows, codes, cols):
+        if len(rows):
+            self._rows.append(np.asarray(rows, dtype=np.int64))
+            self._codes.append(np.asarray(codes, dtype=np.int32))
+            self._cols.append(np.broadcast_to(np.asarray(cols, dtype=np.int32), (len(rows),)))
+
+    def add(self, rows, message, column=None):
+        """
+        Record the same issue for several rows.
+
+        Args:
+            rows (array-like): Row numbers with the issue.
+            message (str): Issue description.
+            column (str, optional): Column the issue was found in.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows):
+            self._append(rows, np.full(len(rows), self.intern(message), dtype=np.int32), self._intern_column(column))
+
+    def add_messages(self, rows, messages, column=None):
+        """
+        Record one issue per row, with messages that may differ between rows.
+
+        Args:
+            rows (array-like): Row number of each issue.
+            messages (array-like): Issue description of each row.
+            column (str, optional): Column the issues were found in.
+        """
+        codes, uniques = pd.factorize(np.asarray(messages, dtype=object))
+        if len(codes):
+            lookup = np.array([self.intern(message) for message in uniques], dtype=np.int32)
+            self._append(rows, lookup[codes], self._intern_column(column))
+
+    def extend(self, other, column=None):
+        """
+        Append all issues of another store after the ones already recorded.
+
+        Args:
+            other (IssueStore): Store to append.
+            column (str, optional): Column for the appended issues that do not name one.
+        """
+        if len(other):
+            lookup = np.array([self.intern(message) for message in other.messages], dtype=np.int32)
+            # Index -1 (no column) maps to the last entry: ``column``
+            col_lookup = np.array([self._intern_column(col) for col in [*other.columns, column]], dtype=np.int32)
+            self._append(other.rows, lookup[other.codes], col_lookup[other.column_codes])
+
+    @property
+    def rows(self):
+        """np.ndarray: Row number of each issue, in the order added."""
+        self._consolidate()
+        return self._rows[0] if self._rows else np.empty(0, dtype=np.int64)
+
+    @property
+    def codes(self):
+        """np.ndarray: Message code of each issue, in the order added."""
+        self._consolidate()
+        return self._codes[0] if self._codes else np.empty(0, dtype=np.int32)
+
+    @property
+    def column_codes(self):
+        """np.ndarray: Column code of each issue (index into ``columns``, -1 for none), in the order added."""
+        self._consolidate()
+        return self._cols[0] if self._cols else np.empty(0, dtype=np.int32)
+
+    def _consolidate(self):
+        if len(self._rows) > 1:
+            self._rows = [np.concatenate(self._rows)]
+            self._codes = [np.concatenate(self._codes)]
+            self._cols = [np.concatenate(self._cols)]
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._rows)
+
+    def issue_text(self):
+        """
+        Join each row's issues into its Issues cell text.
+
+        Returns:
+            tuple: (rows, text) with the sorted distinct rows that have issues and
+                their messages joined with "; ", in the order they were added.
+        """
+        order = np.argsort(self.rows, kind="stable")
+        messages = np.asarray(self.messages, dtype=object)[self.codes[order]]
+        return join_runs(self.rows[order], messages)
+
+    def cells(self):
+        """
+        Return every issue with the column it was found in.
+
+        Returns:
+            tuple: (rows, columns, messages) arrays in the order added, with None
+                as the column of issues not tied to one.
+        """
+        columns = np.asarray([*self.columns, None], dtype=object)
+        return self.rows, columns[self.column_codes], np.asarray(self.messages, dtype=object)[self.codes]
+
+    def to_dict(self):
+        """Return the issues as {row: [message, ...]}."""
+        row_issues = {}
+        for row, code in zip(self.rows.tolist(), self.codes.tolist()):
+            row_issues.setdefault(row, []).append(self.messages[code])
+        return row_issues
+
+    @classmethod
+    def from_dict(cls, row_issues):
+        """Build a store from {row: [message, ...]}."""
+        store = cls()
+        for row, issues in row_issues.items():
+            store.add_messages(np.full(len(issues), row, dtype=np.int64), issues)
+        return store
+
+    @classmethod
+    def concat(cls, stores):
+        """Combine stores, keeping the issues of earlier stores first within a row."""
+        combined = cls()
+        for store in stores:
+            combined.extend(store)
+        return combined
@@ -0,0 +1,221 @@
+"""Background pool of validation jobs, with job IDs and per-stage progress."""
+
+import multiprocessing
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from main import main
+
+# Stages main.main reports, in run order, with their share of a job's progress bar
+STAGE_WEIGHTS = {
+    "load": 0.1,
+    "pattern": 0.45,
+    "validate": 0.25,
+    "write": 0.2
+}
+
+STAGE_LABELS = {
+    "load": "Loading file",
+    "pattern": "Pattern discovery",
+    "validate": "Logical and data type checks",
+    "write": "Writing output"
+}
+
+# Finished jobs are forgotten this many seconds after they end
+JOB_TTL = 3600
+
+
+class Job:
+    """
+    State of one submitted run of main.main, updated by the worker running it.
+
+    Attributes:
+        id (str): Job ID.
+        input_file (str): Input path.
+        output_file (str): Output path.
+        status (str): "queued", "running", "done" or "failed".
+        stage (str): Current stage, a key of STAGE_WEIGHTS.
+        detail (str): What the stage is working on, e.g. a column name.
+        progress (float): Fraction of the job done, from 0 to 1.
+        result (str): Output path main returned, once done.
+        error (str): Why the job failed.
+        submitted, started, finished (float): Times, seconds since the epoch.
+    """
+
+    def __init__(self, job_id, input_file, output_file):
+        self.id = job_id
+        self.input_file = input_file
+        self.output_file = output_file
+        self.status = "queued"
+        self.stage = None
+        self.detail = None
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def seconds(self):
+        """Run time so far, or in total once finished."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def describe(self):
+        """One-line description of the current stage, e.g. "Pattern discovery: Email (3/12)"."""
+        if self.status == "queued":
+            return "Waiting for a free worker..."
+        if self.stage is None:
+            return "Starting..."
+        text = STAGE_LABELS.get(self.stage, self.stage)
+        return f"{text}: {self.detail}" if self.detail else text
+
+    def update(self, stage, done, total, detail=None):
+        """Record progress reported by main.main."""
+        self.stage = stage
+        self.detail = f"{detail} ({done}/{total})" if detail and total > 1 else detail
+        if stage in STAGE_WEIGHTS:
+            stages = list(STAGE_WEIGHTS)
+            before = sum(STAGE_WEIGHTS[name] for name in stages[:stages.index(stage)])
+            fraction = done / total if total else 1.0
+            # Never move the bar back, e.g. when a streamed run skips a stage
+            self.progress = max(self.progress, min(1.0, before + STAGE_WEIGHTS[stage] * fraction))
+
+
+# Queue the pool's processes report job events to, set by _init_worker
+_events = None
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+
+
+def _report(job_id, stage, done, total, detail=None):
+    # Progress callback of main.main in a pool process
+    _events.put((job_id, "progress", (stage, done, total, detail)))
+
+
+def _run_job(job_id, input_file, output_file, options):
+    # Runs in a pool process
+    _events.put((job_id, "started", ()))
+    return main(input_file, output_file, progress=partial(_report, job_id), **options)
+
+
+class JobPool:
+    """
+    Run main.main in background processes, one job per submitted file.
+
+    The pool is shared by every session of the app: up to ``max_workers``
+    jobs run at once and the rest wait in submission order. Each job runs
+    in its own process, so jobs do not contend for the GIL or share
+    warnings and pandas state with each other or the app. Progress comes
+    back through a queue read by a thread of the pool, and pages poll a
+    job by its ID instead of blocking on it.
+
+    Args:
+        max_workers (int): Jobs run at the same time.
+    """
+
+    def __init__(self, max_workers=2):
+        # Spawned, not forked: the app's process runs threads of its own
+        context = multiprocessing.get_context("spawn")
+        self._events = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=context, initializer=_init_worker, initargs=(self._events,)
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._read_events, name="job-events", daemon=True).start()
+
+    def submit(self, input_file, output_file, output_cache=None, cache_key=None, work_dir=None, **options):
+        """
+        Queue a run of main.main.
+
+        Args:
+            input_file (str): Input path.
+            output_file (str): Output path.
+            output_cache (OutputCache, optional): Cache the output is moved into
+                under ``cache_key`` once the job is done; the job's result is
+                then the cached file.
+            cache_key (str, optional): Key of the output in ``output_cache``.
+            work_dir (str, optional): Directory removed when the job ends, done or
+                failed, e.g. the one holding the uploaded input; outputs to keep
+                must be moved out of it, as ``output_cache`` does.
+            **options: Other arguments of main.main, e.g. result_cache; they are
+                sent to the job's process, so must be picklable.
+
+        Returns:
+            str: Job ID.
+        """
+        job = Job(uuid.uuid4().hex, str(input_file), str(output_file))
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        future = self._executor.submit(_run_job, job.id, job.input_file, job.output_file, options)
+        future.add_done_callback(partial(self._finish, job, output_cache, cache_key, work_dir))
+        return job.id
+
+    def get(self, job_id):
+        """Return the Job with ID ``job_id``, or None if it is unknown or was forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id):
+        """Drop a job from the pool; a running job still finishes."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _prune(self):
+        # Forget jobs whose pages were closed without collecting them
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.done and now - job.finished > JOB_TTL:
+                del self._jobs[job_id]
+
+    def _read_events(self):
+        # Apply the events reported by the pool's processes to their jobs
+        while True:
+            job_id, kind, args = self._events.get()
+            job = self.get(job_id)
+            # Events may arrive after the job ended; they no longer apply
+            if job is None or job.done:
+                continue
+            if kind == "started":
+                job.status = "running"
+                job.started = time.time()
+            else:
+                job.update(*args)
+
+    @staticmethod
+    def _finish(job, output_cache, cache_key, work_dir, future):
+        # Called in the parent process when a job's process returns or fails
+        if job.started is None:
+            job.started = job.submitted
+        try:
+            job.result = future.result()
+            if job.result is None:
+                job.error = "The file could not be processed."
+            elif output_cache is not None:
+                # Cached even if the page that submitted the job was closed
+                job.result = str(output_cache.put(cache_key, job.result))
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+        finally:
+            # Removed even if no page polls the job again, e.g. after a reset
+            if work_dir is not None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        job.finished = time.time()
+        job.status = "failed" if job.error else "done"
+        if not job.error:
+            job.progress = 1.0
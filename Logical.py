@@ -1,188 +1,259 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import re
-from unidecode import unidecode
-
-def is_invalid_name(name):
-    if not isinstance(name, str):
-        name = str(name)
-    name = unidecode(name.strip()).lower()
-    if not name or name == "nan":
-        return ''
-    if re.search(r"(.)\1{3,}", name):
-        return "wrong: excessive repeated characters"
-    if len(name) <= 2 and not re.search(r"[aeiouy]", name):
-        return "wrong: too short and no vowels"
-    if not re.search(r"[aeiouy]", name):
-        return "wrong: no vowels"
-    if re.search(r"[^aeiouy\s]{5,}", name):
-        return "wrong: too many consecutive consonants"
-    return "not wrong"
-
-def logical_dob(dob_series, today):
-    dob = pd.to_datetime(dob_series, errors='coerce')  # Relies on Data_Type.py for format validation
-    conditions = [
-        dob > today,
-        (today.year - dob.dt.year) > 150
-    ]
-    choices = [
-        "DOB is in the future",
-        "DOB implies age > 150 years"
-    ]
-    mask = dob.notna()
-    issues = pd.Series("", index=dob_series.index)
-    if mask.any():
-        issues[mask] = np.select(conditions, choices, default="")[mask]
-    invalid = (issues != "") & (dob_series.notna())
-    indices = dob_series.index[invalid].tolist()
-    return indices, issues
-
-def logical_phone(phone_series):
-    def validate_phone_list(value):
-        if pd.isna(value) or value == "":
-            return ""
-        phones = str(value).split("|")
-        issues = []
-        for phone in phones:
-            cleaned = re.sub(r"[^\d]", "", phone.strip())
-            if not re.match(r"^\d{10}$|^\d{12}$", cleaned):
-                issues.append(f"Invalid phone: {phone}")
-        return "; ".join(issues) if issues else ""
-
-    issues = phone_series.apply(validate_phone_list)
-    invalid = issues != ""
-    indices = phone_series.index[invalid].tolist()
-    return indices, issues
-
-def logical_pan(pan_series):
-    pan = pan_series.astype(str).str.strip()
-    mask = pan_series.notna() & (pan != "")
-    length_invalid = mask & (pan.str.len() != 10)
-    length_indices = pan_series.index[length_invalid].tolist()
-    length_issues = np.where(length_invalid, "PAN is not 10 characters", "")
-    duplicates_mask = mask & pan.duplicated(keep=False)
-    duplicate_indices = pan_series.index[duplicates_mask].tolist()
-    duplicate_issues = np.where(duplicates_mask, "PAN is duplicated", "")
-    issues = pd.Series("", index=pan_series.index)
-    for idx, (length_issue, dup_issue) in zip(pan_series.index, zip(length_issues, duplicate_issues)):
-        if length_issue or dup_issue:
-            issues[idx] = "; ".join([i for i in [length_issue, dup_issue] if i])
-    return length_indices, duplicate_indices, issues
-
-def logical_age(age_series, today):
-    age = pd.to_numeric(age_series, errors='coerce')
-    conditions = [
-        age < 0,
-        age > 140
-    ]
-    choices = [
-        "Age cannot be less than 0",
-        "Age cannot be more than 140"
-    ]
-    mask = age.notna()
-    issues = pd.Series("", index=age_series.index)
-    if mask.any():
-        issues[mask] = np.select(conditions, choices, default="")[mask]
-    invalid = (issues != "") & (age_series.notna())
-    indices = age_series.index[invalid].tolist()
-    return indices, issues
-
-def logical_dod(dod_series, today):
-    dod = pd.to_datetime(dod_series, errors='coerce')
-    invalid = dod.notna() & (dod > today)
-    issues = np.where(invalid, "DOD is in the future", "")
-    indices = dod_series.index[invalid].tolist()
-    return indices, pd.Series(issues, index=dod_series.index)
-
-def logical_address(address_series):
-    addr = address_series.astype(str).str.strip()
-    mask = address_series.notna() & (addr != "")
-    invalid = mask & (addr.str.len() <= 5)
-    issues = np.where(invalid, "Address is too short (≤ 5 characters)", "")
-    indices = address_series.index[invalid].tolist()
-    return indices, pd.Series(issues, index=address_series.index)
-
-def logical_email(email_series):
-    def validate_email_list(value):
-        if pd.isna(value) or value == "":
-            return ""
-        emails = str(value).split("|")
-        issues = []
-        for email in emails:
-            if not re.match(r"^[^@]+@[^@]+\.[^@]+$", email.strip()):
-                issues.append(f"Invalid email: {email}")
-        return "; ".join(issues) if issues else ""
-
-    issues = email_series.apply(validate_email_list)
-    invalid = issues != ""
-    indices = email_series.index[invalid].tolist()
-    return indices, issues
-
-def logical_name(name_series):
-    mask = name_series.notna() & (name_series.astype(str) != "")
-    issues = pd.Series("", index=name_series.index)
-    if mask.any():
-        issues[mask] = name_series[mask].apply(is_invalid_name).replace("not wrong", "")
-    invalid = issues != ""
-    indices = name_series.index[invalid].tolist()
-    return indices, issues
-
-def logical(df, matched_cols=None):
-    today = pd.Timestamp(datetime.today().date())
-    error_indices = {col: [] for col in matched_cols.values()} if matched_cols else {}
-    error_indices["Duplicates"] = []
-    row_issues = {}
-
-    col_funcs = {
-        "DOB": lambda col: logical_dob(df[col], today),
-        "Phone": lambda col: logical_phone(df[col]),
-        "pan": lambda col: logical_pan(df[col]),
-        "DOD": lambda col: logical_dod(df[col], today),
-        "Address": lambda col: logical_address(df[col]),
-        "Email": lambda col: logical_email(df[col]),
-        "Name": lambda col: logical_name(df[col]),
-        "Age": lambda col: logical_age(df[col], today)
-    }
-
-    if matched_cols:
-        for expected_col, actual_col in matched_cols.items():
-            if expected_col in col_funcs:
-                if expected_col == "pan":
-                    length_indices, duplicate_indices, issues = col_funcs[expected_col](actual_col)
-                    error_indices[actual_col] = length_indices
-                    error_indices["Duplicates"] = duplicate_indices
-                else:
-                    indices, issues = col_funcs[expected_col](actual_col)
-                    error_indices[actual_col] = indices
-                for idx, issue in issues.items():
-                    if issue:
-                        issue_list = issue.split("; ") if "; " in issue else [issue]
-                        row_issues[idx] = row_issues.get(idx, []) + issue_list
-
-    return error_indices, row_issues
-
-if __name__ == "__main__":
-    data = {
-        "DOB": ["2000-05-12", "03-08-1968", "2050-12-01", None, "1998-07-15"],
-        "Phone": ["9876543210", "9441924126|9701346831", "12345", "abc|9441924126", ""],
-        "pan": ["ABCDE1234X", "1234567890", "ABCDE1234X", "SHORT123", None],
-        "DOD": ["2023-12-12", "2050-01-01", None, "2010-06-10", ""],
-        "Address": ["123 Street", "Apt", "    ", "Some Place", ""],
-        "Email": ["user1@example.com", "arjunavalasasachivalayam@gmail.com|malleswararodalli1@gmail.com|sachivalayamkrishnapuram@gmail.com", "no@at", "abc@|xyz@gmail.com", ""],
-        "Name": ["John", "Effff", "Xy", "", "Alice"]
-    }
-    df = pd.DataFrame(data)
-    matched_cols = {
-        "DOB": "DOB",
-        "Phone": "Phone",
-        "pan": "pan",
-        "DOD": "DOD",
-        "Address": "Address",
-        "Email": "Email",
-        "Name": "Name",
-        "Age": "Age"
-    }
-    error_indices, row_issues = logical(df, matched_cols=matched_cols)
-    print("error_indices:", error_indices)
-    print("\nrow_issues:", row_issues)
\ No newline at end of file
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import re
+from collections import Counter
+from Column_Cache import ColumnCache, as_text, parse_dates, parse_numbers, split_lists
+from Issue_Store import IssueStore, join_runs
+
+# Name plausibility rules, checked in this order
+_REPEATED_RE = re.compile(r"(.)\1{3,}")
+_VOWEL_RE = re.compile(r"[aeiouy]")
+_CONSONANT_RUN_RE = re.compile(r"[^aeiouy\s]{5,}")
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+def is_invalid_name(name):
+    from unidecode import unidecode  # Imported on first use to keep startup fast
+    if not isinstance(name, str):
+        name = str(name)
+    name = unidecode(name.strip()).lower()
+    if not name or name == "nan":
+        return ''
+    if _REPEATED_RE.search(name):
+        return "wrong: excessive repeated characters"
+    if len(name) <= 2 and not _VOWEL_RE.search(name):
+        return "wrong: too short and no vowels"
+    if not _VOWEL_RE.search(name):
+        return "wrong: no vowels"
+    if _CONSONANT_RUN_RE.search(name):
+        return "wrong: too many consecutive consonants"
+    return "not wrong"
+
+def logical_dob(dob_series, today, dob=None):
+    # Parsed dates are shared with Data_Type.py, which reports format errors
+    if dob is None:
+        _, dob = parse_dates(dob_series)
+    conditions = [
+        dob > today,
+        (today.year - dob.dt.year) > 150
+    ]
+    choices = [
+        "DOB is in the future",
+        "DOB implies age > 150 years"
+    ]
+    mask = dob.notna()
+    issues = pd.Series("", index=dob_series.index)
+    if mask.any():
+        issues[mask] = np.select(conditions, choices, default="")[mask]
+    invalid = (issues != "") & (dob_series.notna())
+    indices = dob_series.index[invalid].tolist()
+    return indices, issues
+
+# Patterns are passed to the .str methods as strings, which Arrow-backed
+# strings match with Arrow's regex engine (RE2) instead of per value in Python.
+# They must mean the same in both engines: digits are ASCII only (RE2's \d is,
+# Python's is not), and alternatives are grouped, since pandas anchors a
+# fullmatch pattern for Arrow as "^...$"
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+_PHONE_RE = re.compile(r"[0-9]{10}(?:[0-9]{2})?")
+_EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+def _item_issues(items, invalid, prefix, index):
+    # "<prefix><item>" for each invalid item, joined with "; " per row ("" for valid rows);
+    # exploded items of a row are adjacent
+    messages = prefix + items[invalid]
+    rows, text = join_runs(messages.index.to_numpy(), messages.to_numpy(dtype=object))
+    return pd.Series(text, index=rows, dtype=object).reindex(index, fill_value="")
+
+def logical_phone(phone_series, phone_items=None):
+    # Pipe-separated phones are validated as one exploded Series of items
+    if phone_items is None:
+        phone_items = split_lists(phone_series)
+    cleaned = phone_items.str.replace(_NON_DIGIT_RE.pattern, "", regex=True)
+    invalid = ~cleaned.str.fullmatch(_PHONE_RE.pattern).astype(bool)
+    issues = _item_issues(phone_items, invalid, "Invalid phone: ", phone_series.index)
+    indices = phone_series.index[issues != ""].tolist()
+    return indices, issues
+
+def pan_value_counts(pan_series, counts=None):
+    # Running PAN counts, so duplicates can be found across row batches
+    counts = Counter() if counts is None else counts
+    counts.update(as_text(pan_series).str.strip().value_counts().to_dict())
+    return counts
+
+def logical_pan(pan_series, pan_counts=None):
+    pan = as_text(pan_series).str.strip()
+    mask = pan_series.notna() & (pan != "")
+    length_invalid = mask & (pan.str.len() != 10)
+    length_indices = pan_series.index[length_invalid].tolist()
+    length_issues = np.where(length_invalid, "PAN is not 10 characters", "")
+    if pan_counts is None:
+        duplicates_mask = mask & pan.duplicated(keep=False)
+    else:
+        duplicates_mask = mask & (pan.map(pd.Series(pan_counts, dtype="int64")).fillna(0) > 1)
+    duplicate_indices = pan_series.index[duplicates_mask].tolist()
+    duplicate_issues = np.where(duplicates_mask, "PAN is duplicated", "")
+    issues = pd.Series("", index=pan_series.index)
+    for idx, (length_issue, dup_issue) in zip(pan_series.index, zip(length_issues, duplicate_issues)):
+        if length_issue or dup_issue:
+            issues[idx] = "; ".join([i for i in [length_issue, dup_issue] if i])
+    return length_indices, duplicate_indices, issues
+
+def logical_age(age_series, today, age=None):
+    if age is None:
+        age = parse_numbers(age_series)
+    conditions = [
+        age < 0,
+        age > 140
+    ]
+    choices = [
+        "Age cannot be less than 0",
+        "Age cannot be more than 140"
+    ]
+    mask = age.notna()
+    issues = pd.Series("", index=age_series.index)
+    if mask.any():
+        issues[mask] = np.select(conditions, choices, default="")[mask]
+    invalid = (issues != "") & (age_series.notna())
+    indices = age_series.index[invalid].tolist()
+    return indices, issues
+
+def logical_dod(dod_series, today, dod=None):
+    if dod is None:
+        _, dod = parse_dates(dod_series)
+    invalid = dod.notna() & (dod > today)
+    issues = np.where(invalid, "DOD is in the future", "")
+    indices = dod_series.index[invalid].tolist()
+    return indices, pd.Series(issues, index=dod_series.index)
+
+def logical_address(address_series):
+    addr = as_text(address_series).str.strip()
+    mask = address_series.notna() & (addr != "")
+    invalid = mask & (addr.str.len() <= 5)
+    issues = np.where(invalid, "Address is too short (≤ 5 characters)", "")
+    indices = address_series.index[invalid].tolist()
+    return indices, pd.Series(issues, index=address_series.index)
+
+def logical_email(email_series, email_items=None):
+    if email_items is None:
+        email_items = split_lists(email_series)
+    invalid = ~email_items.str.strip().str.fullmatch(_EMAIL_RE.pattern).astype(bool)
+    issues = _item_issues(email_items, invalid, "Invalid email: ", email_series.index)
+    indices = email_series.index[issues != ""].tolist()
+    return indices, issues
+
+def logical_name(name_series):
+    # is_invalid_name over the column's distinct values: each rule is one mask,
+    # and np.select keeps its first-match-wins order
+    mask = name_series.notna() & (as_text(name_series) != "")
+    issues = pd.Series("", index=name_series.index)
+    if mask.any():
+        codes, uniques = pd.factorize(as_text(name_series[mask]))
+        names = pd.Series(uniques, dtype=object).str.strip()
+        # Only non-ASCII names need transliterating
+        non_ascii = names.str.contains(_NON_ASCII_RE)
+        if non_ascii.any():
+            from unidecode import unidecode
+            names[non_ascii] = names[non_ascii].map(unidecode)
+        names = names.str.lower()
+        has_vowel = names.str.contains(_VOWEL_RE).to_numpy(dtype=bool)
+        conditions = [
+            ((names == "") | (names == "nan")).to_numpy(dtype=bool),
+            # Series.str.contains warns about the backreference group
+            names.map(_REPEATED_RE.search).notna().to_numpy(dtype=bool),
+            (names.str.len() <= 2).to_numpy(dtype=bool) & ~has_vowel,
+            ~has_vowel,
+            names.str.contains(_CONSONANT_RUN_RE).to_numpy(dtype=bool)
+        ]
+        choices = [
+            "",
+            "wrong: excessive repeated characters",
+            "wrong: too short and no vowels",
+            "wrong: no vowels",
+            "wrong: too many consecutive consonants"
+        ]
+        issues[mask] = np.select(conditions, choices, default="")[codes]
+    invalid = issues != ""
+    indices = name_series.index[invalid].tolist()
+    return indices, issues
+
+def logical_column(expected_col, series, today, cache=None, pan_counts=None):
+    # Logical check of one matched column: (indices, duplicate_indices, issues),
+    # duplicate_indices only for PAN; None if the column has no logical check
+    col = series.name
+    if cache is None:
+        cache = ColumnCache(series.to_frame())
+
+    col_funcs = {
+        "DOB": lambda: logical_dob(series, today, cache.get(col, "date", dayfirst=True)[1]),
+        "Phone": lambda: logical_phone(series, cache.get(col, "items")),
+        "pan": lambda: logical_pan(series, pan_counts),
+        "DOD": lambda: logical_dod(series, today, cache.get(col, "date", dayfirst=True)[1]),
+        "Address": lambda: logical_address(series),
+        "Email": lambda: logical_email(series, cache.get(col, "items")),
+        "Name": lambda: logical_name(series),
+        "Age": lambda: logical_age(series, today, cache.get(col, "numeric"))
+    }
+
+    if expected_col not in col_funcs:
+        return None
+    if expected_col == "pan":
+        return col_funcs[expected_col]()
+    indices, issues = col_funcs[expected_col]()
+    return indices, None, issues
+
+def merge_logical_results(matched_cols, results):
+    # Build (error_indices, row_issues) from logical_column results in matched_cols order;
+    # row_issues is an IssueStore
+    error_indices = {col: [] for col in matched_cols.values()} if matched_cols else {}
+    error_indices["Duplicates"] = []
+    row_issues = IssueStore()
+
+    for actual_col, result in zip(matched_cols.values(), results):
+        if result is None:
+            continue
+        indices, duplicate_indices, issues = result
+        error_indices[actual_col] = indices
+        if duplicate_indices is not None:
+            error_indices["Duplicates"] = duplicate_indices
+        # A row's issues for one column are joined with "; "
+        issues = issues[issues != ""].str.split("; ").explode()
+        row_issues.add_messages(issues.index, issues.to_numpy(), column=actual_col)
+
+    return error_indices, row_issues
+
+def logical(df, matched_cols=None, pan_counts=None, cache=None):
+    today = pd.Timestamp(datetime.today().date())
+    if cache is None:
+        cache = ColumnCache(df)
+    matched_cols = matched_cols or {}
+    results = [
+        logical_column(expected_col, df[actual_col], today, cache, pan_counts)
+        for expected_col, actual_col in matched_cols.items()
+    ]
+    return merge_logical_results(matched_cols, results)
+
+if __name__ == "__main__":
+    data = {
+        "DOB": ["2000-05-12", "03-08-1968", "2050-12-01", None, "1998-07-15"],
+        "Phone": ["9876543210", "9441924126|9701346831", "12345", "abc|9441924126", ""],
+        "pan": ["ABCDE1234X", "1234567890", "ABCDE1234X", "SHORT123", None],
+        "DOD": ["2023-12-12", "2050-01-01", None, "2010-06-10", ""],
+        "Address": ["123 Street", "Apt", "    ", "Some Place", ""],
+        "Email": ["user1@example.com", "arjunavalasasachivalayam@gmail.com|malleswararodalli1@gmail.com|sachivalayamkrishnapuram@gmail.com", "no@at", "abc@|xyz@gmail.com", ""],
+        "Name": ["John", "Effff", "Xy", "", "Alice"]
+    }
+    df = pd.DataFrame(data)
+    matched_cols = {
+        "DOB": "DOB",
+        "Phone": "Phone",
+        "pan": "pan",
+        "DOD": "DOD",
+        "Address": "Address",
+        "Email": "Email",
+        "Name": "Name",
+        "Age": "Age"
+    }
+    error_indices, row_issues = logical(df, matched_cols=matched_cols)
+    print("error_indices:", error_indices)
+    print("\nrow_issues:", row_issues.to_dict())
\ No newline at end of file
@@ -1,72 +1,110 @@
-from collections import Counter
-import re
-import pandas as pd
-import numpy as np
-
-def get_common_words(df, column_name):
-    text = ' '.join(df[column_name].dropna().astype(str))
-    words = re.findall(r'\b(?!\d{1,2}\b)[a-zA-Z0-9]{2,}\b', text.lower())
-    word_counts = Counter(words)
-    top_10_percent = int(len(word_counts) * 0.1) or 1
-    return [word for word, _ in word_counts.most_common(top_10_percent)]
-
-def pattern_clustering(df, column_name, threshold=1.0):
-    cluster_id_column = f"{column_name}_Cluster_ID"
-    percentage_column = f"{column_name}_Cluster_Percentage"
-    
-    result_df = df[[column_name]].copy()
-    result_df[column_name] = result_df[column_name].fillna("")  # Treat NaN as empty string
-    
-    # Assign cluster IDs
-    result_df[cluster_id_column] = result_df.groupby(column_name).ngroup()
-    
-    # Calculate percentages
-    pattern_counts = result_df[column_name].value_counts(normalize=True) * 100
-    
-    result_df[percentage_column] = result_df[column_name].map(pattern_counts)
-    
-    # Exclude empty strings from low-coverage patterns
-    low_coverage_patterns = pattern_counts[(pattern_counts < threshold) & (pattern_counts.index != "")].index.tolist()
-    
-    # Only flag non-empty rows
-    mask = result_df[column_name] != ""
-    pattern_issues = result_df[mask & result_df[column_name].isin(low_coverage_patterns)].index.tolist()
-    
-    pattern_percentage_dict = pattern_counts.to_dict()
-    
-    row_issues = {}
-    invalid = mask & result_df[column_name].isin(low_coverage_patterns)
-    issues = np.where(
-        invalid,
-        f"Pattern coverage below {threshold}% threshold",
-        ""
-    )
-    index = 0
-    while index < len(issues):
-        if issues[index]:
-            row_issues[index] = [issues[index]]
-        index += 1
-    
-    return pattern_issues, result_df, pattern_percentage_dict, row_issues
-
-def main():
-    data = {
-        'text_column': [
-            'AB1234567', 'CD9876543', 'AB1234567', 'XY7654321', 
-            'A123456', 'BC12XYZ89', 'EF4567890', 'G123', 'KL5432109', 
-            'MN12', 'AB12345XY', '', None
-        ]
-    }
-    df = pd.DataFrame(data)
-    common_words = get_common_words(df, 'text_column')
-    print("Top 10% common words:", common_words)
-    print("\n")
-    pattern_issues, result_df, pattern_percentage_dict, row_issues = pattern_clustering(df, 'text_column', threshold=10.0)  # Adjusted threshold for demo
-    print("Pattern Issues (Low coverage indexes):", pattern_issues)
-    print("\nUpdated DataFrame (result_df):")
-    print(result_df)
-    print("\nPattern-Percentage Dictionary:", pattern_percentage_dict)
-    print("\nRow-wise Pattern Issues:", row_issues)
-
-if __name__ == "__main__":
+from collections import Counter
+import re
+import pandas as pd
+import numpy as np
+from Issue_Store import IssueStore
+
+def get_common_words(df, column_name):
+    text = ' '.join(df[column_name].dropna().astype(str))
+    words = re.findall(r'\b(?!\d{1,2}\b)[a-zA-Z0-9]{2,}\b', text.lower())
+    word_counts = Counter(words)
+    top_10_percent = int(len(word_counts) * 0.1) or 1
+    return [word for word, _ in word_counts.most_common(top_10_percent)]
+
+def _pattern_codes(series):
+    """Return sorted cluster codes per row and the distinct patterns they index."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.categories.is_monotonic_increasing:
+        codes = series.cat.codes.to_numpy()
+        if (codes >= 0).all():
+            patterns = series.cat.categories
+            observed = np.bincount(codes, minlength=len(patterns)) > 0
+            if not observed.all():
+                codes = (np.cumsum(observed) - 1)[codes]
+                patterns = patterns[observed]
+            return codes.astype(np.int64), patterns
+        series = series.astype(object)
+    return pd.factorize(series.fillna(""), sort=True)  # Treat NaN as empty string
+
+def pattern_clustering(df, column_name, threshold=1.0, counts=None):
+    """
+    Cluster a column by pattern and flag patterns below the coverage threshold.
+
+    Accepts raw pattern strings or the categorical signatures produced by
+    Text_PreProc.pattern_signatures, whose codes are used directly. Pattern
+    counts already known, e.g. from Text_PreProc.signature_counts, are used
+    instead of counting the rows again.
+    """
+    cluster_id_column = f"{column_name}_Cluster_ID"
+    percentage_column = f"{column_name}_Cluster_Percentage"
+
+    # Assign cluster IDs
+    codes, patterns = _pattern_codes(df[column_name])
+
+    # Calculate percentages
+    if counts is None:
+        counts = np.bincount(codes, minlength=len(patterns))
+    percentages, low_coverage = pattern_coverage(counts, patterns, threshold)
+    pattern_counts = pd.Series(percentages, index=patterns).sort_values(ascending=False, kind="stable")
+
+    values = df[column_name]
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.fillna("")
+    result_df = pd.DataFrame({
+        column_name: values,
+        cluster_id_column: codes,
+        percentage_column: percentages[codes]
+    }, index=df.index)
+
+    invalid = low_coverage[codes]
+    pattern_issues = df.index[invalid].tolist()
+
+    pattern_percentage_dict = pattern_counts.to_dict()
+
+    row_issues = coverage_row_issues(np.flatnonzero(invalid), threshold)
+
+    return pattern_issues, result_df, pattern_percentage_dict, row_issues
+
+def pattern_coverage(counts, patterns, threshold=1.0):
+    """
+    Compute pattern percentages and which patterns fall below the threshold.
+
+    Args:
+        counts (np.ndarray): Number of rows per pattern, over the whole column.
+        patterns (sequence): Pattern string for each entry of ``counts``.
+        threshold (float): Minimum coverage percentage.
+
+    Returns:
+        tuple: (percentages, low_coverage) arrays aligned with ``patterns``.
+    """
+    percentages = counts / counts.sum() * 100
+    # Exclude empty strings from low-coverage patterns; only flag non-empty rows
+    low_coverage = (percentages < threshold) & (np.asarray(patterns, dtype=object) != "")
+    return percentages, low_coverage
+
+def coverage_row_issues(rows, threshold=1.0):
+    """Build an IssueStore of row-wise issues from the positions of low-coverage rows."""
+    row_issues = IssueStore()
+    row_issues.add(rows, f"Pattern coverage below {threshold}% threshold")
+    return row_issues
+
+def main():
+    data = {
+        'text_column': [
+            'AB1234567', 'CD9876543', 'AB1234567', 'XY7654321', 
+            'A123456', 'BC12XYZ89', 'EF4567890', 'G123', 'KL5432109', 
+            'MN12', 'AB12345XY', '', None
+        ]
+    }
+    df = pd.DataFrame(data)
+    common_words = get_common_words(df, 'text_column')
+    print("Top 10% common words:", common_words)
+    print("\n")
+    pattern_issues, result_df, pattern_percentage_dict, row_issues = pattern_clustering(df, 'text_column', threshold=10.0)  # Adjusted threshold for demo
+    print("Pattern Issues (Low coverage indexes):", pattern_issues)
+    print("\nUpdated DataFrame (result_df):")
+    print(result_df)
+    print("\nPattern-Percentage Dictionary:", pattern_percentage_dict)
+    print("\nRow-wise Pattern Issues:", row_issues.to_dict())
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""Disk-backed caches of validation results and output files, with size-based LRU eviction."""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+
+def column_hash(series):
+    """
+    Hash the content of a column: its values, dtype and row index.
+
+    Args:
+        series (pd.Series): Column values.
+
+    Returns:
+        str: Hex digest, equal for columns with the same content.
+    """
+    digest = hashlib.sha256(str(series.dtype).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def bytes_hash(data):
+    """Hash the raw bytes of a file, e.g. an upload, as a hex digest."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _tmp_path(path):
+    # Per-process, per-thread temporary name to write ``path`` through before an atomic replace
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def rules_version():
+    """Hash of the validation rules: Config.RULES_VERSION, EXPECTED_COLS and DTYPES."""
+    from Config import RULES_VERSION, EXPECTED_COLS, DTYPES
+
+    payload = json.dumps([RULES_VERSION, EXPECTED_COLS, DTYPES], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Pickled results in a directory, one file per key, evicted least recently used
+    first once the directory grows past ``max_bytes``.
+
+    Args:
+        directory (str): Cache directory, created if missing.
+        max_bytes (int): Size limit of the cached files.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory, max_bytes=512 * 2**20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.version = rules_version()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content_hash, role, *extra):
+        """
+        Build the key of a column result.
+
+        Args:
+            content_hash (str): column_hash of the column.
+            role (str): What was computed, e.g. "pattern" or the expected column
+                the column was matched to.
+            *extra: Other inputs the result depends on, e.g. the run date.
+
+        Returns:
+            str: Cache key.
+        """
+        payload = json.dumps([self.version, content_hash, role, *map(str, extra)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def get(self, key, default=None):
+        """Return the cached result for ``key``, or ``default`` if it is not cached."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return default
+        # Touch the file so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Cache ``value`` under ``key`` and evict old entries if over the size limit."""
+        path = self._path(key)
+        tmp = _tmp_path(path)
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Args:
+            keep (Path, optional): Entry that is never removed, e.g. one just added.
+        """
+        entries = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue  # Open elsewhere, e.g. on Windows
+            total -= size
+
+
+class OutputCache(ResultCache):
+    """
+    Processed output files, keyed by the content of the input file, evicted
+    least recently used first once the directory grows past ``max_bytes``.
+
+    Keys also depend on the validation rules and the issue colors, so a
+    cached workbook is only reused while it would come out the same.
+
+    Args:
+        directory (str): Cache directory, created if missing.
+        max_bytes (int): Size limit of the cached files.
+    """
+
+    SUFFIX = ".xlsx"
+
+    def __init__(self, directory, max_bytes=256 * 2**20):
+        from Config import COLORS, PRIORITIES
+
+        super().__init__(directory, max_bytes)
+        payload = json.dumps([self.version, COLORS, PRIORITIES], sort_keys=True)
+        self.version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, key, default=None):
+        """
+        Return the content of the output cached for ``key``, or ``default`` if it is not cached.
+
+        The file is read at once, so an eviction by a concurrent job cannot
+        remove it between the lookup and the read; a file evicted before it
+        is opened is a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return default
+        # Touch the file so eviction sees it as recently used, unless it was evicted since
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, output_file):
+        """
+        Move a processed output into the cache under ``key`` and evict old
+        entries if over the size limit.
+
+        Returns:
+            Path: The cached file.
+        """
+        path = self._path(key)
+        tmp = _tmp_path(path)
+        shutil.move(str(output_file), tmp)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return path
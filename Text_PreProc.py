@@ -1,151 +1,853 @@
-"""Handles text preprocessing and pattern clustering."""
-
-import pandas as pd
-import nltk
-import re
-from collections import Counter
-from fuzzywuzzy import process
-
-
-def load_excel(file_path):
-    """
-    Load an Excel file into a DataFrame.
-
-    Args:
-        file_path (str): Path to the Excel file.
-
-    Returns:
-        pd.DataFrame: Loaded DataFrame.
-    """
-    df = pd.read_excel(file_path, engine="calamine")
-    df.columns = df.columns.str.strip()
-    return df
-
-def match_cols(df_cols, expected):
-    """
-    Match DataFrame columns to expected column names using fuzzy matching.
-
-    Args:
-        df_cols (Index): DataFrame column names.
-        expected (dict): Dictionary of expected column names and their variations.
-
-    Returns:
-        dict: Dictionary mapping expected names to actual column names.
-    """
-    matched = {}
-    i = 0
-    while i < len(df_cols):
-        col = df_cols[i]
-        j = 0
-        while j < len(expected):
-            key = list(expected.keys())[j]
-            best, score = process.extractOne(col, expected[key])
-            if score >= 80:
-                matched[key] = col
-                break
-            j += 1
-        i += 1
-    return matched
-
-# Initialize stopwords once at module level
-nltk.download('stopwords', quiet=True)
-stop_words = set(nltk.corpus.stopwords.words('english'))
-
-def preprocess_text(df, col):
-    """
-    Preprocess text in a DataFrame column by lowercasing, removing stopwords, and cleaning.
-
-    Args:
-        df (pd.DataFrame): Input DataFrame.
-        col (str): Column name to process.
-
-    Returns:
-        pd.DataFrame: DataFrame with processed text column.
-    """
-    # Convert column to object dtype to avoid dtype mismatch
-    df[col] = df[col].astype(str)
-    
-    i = 0
-    while i < len(df):
-        text = str(df.at[i, col]).lower()
-        words = text.split()
-        j = 0
-        filtered = []
-        while j < len(words):
-            if words[j] not in stop_words:
-                filtered.append(words[j])
-            j += 1
-        text = " ".join(filtered)
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = re.sub(r'[-*#]', ' ', text)
-        df.at[i, col] = text
-        i += 1
-    return df
-
-def get_common_words(df, col):
-    """
-    Extract the top 10% most common words from a column, excluding short numbers.
-
-    Args:
-        df (pd.DataFrame): Input DataFrame.
-        col (str): Column name to analyze.
-
-    Returns:
-        list: List of common words.
-    """
-    text = " ".join(df[col].dropna().astype(str))
-    words = re.findall(r'\b(?!\d{1,2}\b)[a-zA-Z]{2,}|\d{3,}\b', text.lower())
-    counts = Counter(words)
-    top_10 = int(len(counts) * 0.1) or 1
-    common = []
-    i = 0
-    items = counts.most_common()
-    while i < top_10 and i < len(items):
-        common.append(items[i][0])
-        i += 1
-    return common
-
-def replace_words(text, common):
-    """
-    Replace words in text with patterns (e.g., 'CW' for common words).
-
-    Args:
-        text (str): Input text.
-        common (list): List of common words.
-
-    Returns:
-        str: Processed text with replacements.
-    """
-    def transform(word):
-        if word in common:
-            return "CW"
-        if word.isalpha():
-            return f"t{len(word)}"
-        if word.isdigit():
-            return f"n{len(word)}"
-        if any(c.isalpha() for c in word) and any(c.isdigit() for c in word):
-            text_part = "".join(c for c in word if c.isalpha())
-            num_part = "".join(c for c in word if c.isdigit())
-            return f"t{len(text_part)}n{len(num_part)}"
-        return word
-    words = re.findall(r'\w+', text)
-    i = 0
-    result = []
-    while i < len(words):
-        result.append(transform(words[i]))
-        i += 1
-    return " ".join(result)
-
-def normalize_pattern(text):
-    """
-    Normalize text by replacing tX and nX patterns.
-
-    Args:
-        text (str): Input text.
-
-    Returns:
-        str: Normalized text.
-    """
-    text = re.sub(r'\bt\d+\b', 'tX', text)
-    text = re.sub(r'\bn\d+\b', 'nX', text)
-    return text
+"""Handles text preprocessing and pattern clustering."""
+
+import pandas as pd
+import numpy as np
+import re
+import os
+import json
+import hashlib
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from Column_Cache import ARROW_STRING, as_text, is_arrow_string
+
+
+def _projection(names, columns):
+    """Select the header names in ``names`` whose stripped form is listed in ``columns``; None keeps all."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [name for name in names if str(name).strip() in wanted]
+
+def to_arrow_strings(df):
+    """
+    Convert the object columns of a DataFrame to Arrow-backed strings, in place.
+
+    Mixed cells are converted to their string form, as astype(str) would; missing
+    cells stay missing. Numeric and datetime columns keep their dtype.
+
+    Args:
+        df (pd.DataFrame): Loaded sheet or row batch.
+
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            df.isetitem(i, df.iloc[:, i].astype(ARROW_STRING))
+    return df
+
+def cell_values(df):
+    """
+    Undo the datetime64 dtype pd.read_excel infers for date columns, in place,
+    so dates stay Timestamps with NaN for blanks, as in the batches of iter_excel.
+
+    Otherwise a date's text, e.g. "2000-01-01" or "2000-01-01 00:00:00", would
+    depend on the other cells of its column, and streamed runs would see
+    different values than in-memory runs. Numeric columns keep their dtype;
+    as_text prints their whole numbers as ints.
+
+    Args:
+        df (pd.DataFrame): Sheet loaded with pd.read_excel, or a row batch.
+
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if dtype.kind in "mM":
+            column = df.iloc[:, i]
+            df.isetitem(i, column.astype(object).where(column.notna(), np.nan))
+    return df
+
+def load_excel(file_path, columns=None, arrow_strings=False):
+    """
+    Load an Excel file into a DataFrame, with the cell values of cell_values.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+    usecols = None if columns is None else (lambda name: str(name).strip() in set(columns))
+    df = cell_values(pd.read_excel(file_path, engine="calamine", usecols=usecols))
+    df.columns = df.columns.str.strip()
+    return to_arrow_strings(df) if arrow_strings else df
+
+# Strings pd.read_excel reads as missing values by default
+_NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+
+def _cell_value(value):
+    """Convert a raw cell value the way load_excel would, mapping blanks to NaN."""
+    if value is None:
+        return np.nan
+    if isinstance(value, str) and (value in _NA_VALUES or not value.strip()):
+        return np.nan
+    # As pandas converts calamine's cells: whole numbers to int, dates to Timestamp
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date):
+        return pd.Timestamp(value)
+    if isinstance(value, timedelta):
+        return pd.Timedelta(value)
+    return value
+
+def _batch_frame(rows, columns, start):
+    """Build a batch of iter_excel from converted cell values, indexed from row ``start``."""
+    batch = pd.DataFrame(rows, columns=columns, index=pd.RangeIndex(start, start + len(rows)), dtype=object)
+    return cell_values(batch.infer_objects())
+
+def iter_excel(file_path, chunk_size=100000, columns=None, arrow_strings=False):
+    """
+    Stream an Excel file in row batches without loading the whole sheet.
+
+    Numeric columns of a batch get a numeric dtype and the rest keep the
+    type each cell was read with, as in load_excel, so values do not change
+    representation depending on where a batch boundary falls or whether the
+    sheet is streamed.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        chunk_size (int): Number of data rows per batch.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+
+    Yields:
+        pd.DataFrame: Consecutive batches indexed by global row position.
+    """
+    from openpyxl import load_workbook
+
+    convert = to_arrow_strings if arrow_strings else (lambda batch: batch)
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        width = len(header)
+        if columns is None:
+            columns = pd.Index([
+                f"Unnamed: {i}" if name is None else str(name).strip()
+                for i, name in enumerate(header)
+            ])
+            positions = None
+        else:
+            wanted = set(columns)
+            positions = [i for i, name in enumerate(header) if name is not None and str(name).strip() in wanted]
+            columns = pd.Index([str(header[i]).strip() for i in positions])
+        start = 0
+        batch = []
+        for row in rows:
+            if positions is not None:
+                row = tuple(row[i] if i < len(row) else None for i in positions)
+            row = tuple(_cell_value(value) for value in row[:width])
+            # Blank rows are skipped, as pd.read_excel does
+            if all(value is np.nan for value in row):
+                continue
+            batch.append(row + (np.nan,) * (len(columns) - len(row)))
+            if len(batch) == chunk_size:
+                yield convert(_batch_frame(batch, columns, start))
+                start += len(batch)
+                batch = []
+        if batch:
+            yield convert(_batch_frame(batch, columns, start))
+    finally:
+        wb.close()
+
+# Start tag of a sheet row in the worksheet XML, e.g. <row r="2"> or <x:row>
+_ROW_TAG_RE = re.compile(rb"<(?:\w+:)?row[\s>/]")
+
+def _count_row_tags(file_path, worksheet_path):
+    """Count the rows of a worksheet by scanning its XML, without parsing cells."""
+    import zipfile
+
+    count = 0
+    tail = b""
+    with zipfile.ZipFile(file_path) as archive, archive.open(worksheet_path) as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            # Keep a tag split across two blocks whole
+            data = tail + block
+            cut = max(len(data) - 16, 0)
+            count += len(_ROW_TAG_RE.findall(data, 0, cut))
+            tail = data[cut:]
+    return count + len(_ROW_TAG_RE.findall(tail))
+
+def sheet_rows(file_path):
+    """
+    Count the data rows of an Excel file without loading it.
+
+    The count is read from the sheet's recorded dimensions; files that do not
+    record them, such as those written by write-only workbooks, have their
+    rows counted from the sheet XML instead.
+
+    Args:
+        file_path (str): Path to the Excel file.
+
+    Returns:
+        int: Number of rows below the header.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        ws = wb.active
+        max_row = ws.max_row
+        worksheet_path = ws._worksheet_path
+    finally:
+        wb.close()
+    if max_row is None:
+        max_row = _count_row_tags(file_path, worksheet_path)
+    return max(max_row - 1, 0)
+
+def _csv_header(file_path):
+    """Read the header names of a CSV file."""
+    import csv
+
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def _csv_options(file_path, columns=None):
+    """Arrow convert options reading every (projected) column of a CSV file as strings."""
+    import pyarrow as pa
+    from pyarrow import csv
+
+    names = _csv_header(file_path)
+    # Text keeps leading zeros (zip codes, account numbers) and gives every
+    # batch the same types; blanks and the usual NA markers become nulls
+    return csv.ConvertOptions(
+        column_types={name: pa.string() for name in names},
+        include_columns=_projection(names, columns),
+        strings_can_be_null=True
+    )
+
+def _null_blanks(table):
+    """Make whitespace-only strings and NA markers null, as _cell_value makes them NaN for .xlsx cells."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            # One contiguous array; if_else misreads sliced CSV string buffers
+            column = table.column(i).combine_chunks()
+            markers = pa.array(sorted(_NA_VALUES), type=field.type)
+            blank = pc.or_(pc.is_in(column, value_set=markers), pc.utf8_is_space(column))
+            table = table.set_column(i, field, pc.if_else(blank, pa.scalar(None, field.type), column))
+    return table
+
+def _arrow_frame(table, start=0, arrow_strings=False):
+    """
+    Convert an Arrow table to a DataFrame indexed by global row position from ``start``;
+    with arrow_strings, string columns are kept in Arrow memory instead of becoming objects.
+    Blank cells become missing, as in load_excel.
+    """
+    import pyarrow as pa
+
+    string_types = {pa.string(): ARROW_STRING, pa.large_string(): ARROW_STRING}
+    df = _null_blanks(table).to_pandas(types_mapper=string_types.get if arrow_strings else None)
+    df.index = pd.RangeIndex(start, start + len(df))
+    df.columns = df.columns.str.strip()
+    return df
+
+def _arrow_batches(record_batches, chunk_size, arrow_strings=False):
+    """Regroup Arrow record batches into DataFrames of chunk_size rows."""
+    import pyarrow as pa
+
+    pending = []
+    n_pending = 0
+    start = 0
+    for record_batch in record_batches:
+        pending.append(record_batch)
+        n_pending += record_batch.num_rows
+        while n_pending >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield _arrow_frame(table.slice(0, chunk_size), start, arrow_strings)
+            start += chunk_size
+            rest = table.slice(chunk_size)
+            pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield _arrow_frame(pa.Table.from_batches(pending), start, arrow_strings)
+
+def load_csv(file_path, columns=None, arrow_strings=False):
+    """
+    Load a CSV file into a DataFrame with Arrow's multi-threaded reader.
+
+    Every cell is read as text; blank and whitespace-only cells and NA markers
+    become missing, as in load_excel.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Keep the text Arrow-backed (string[pyarrow]).
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+    from pyarrow import csv
+
+    return _arrow_frame(csv.read_csv(file_path, convert_options=_csv_options(file_path, columns)), 0, arrow_strings)
+
+def iter_csv(file_path, chunk_size=100000, columns=None, arrow_strings=False):
+    """
+    Stream a CSV file in row batches, as read by load_csv.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_size (int): Number of data rows per batch.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Keep the text Arrow-backed (string[pyarrow]).
+
+    Yields:
+        pd.DataFrame: Consecutive batches indexed by global row position.
+    """
+    from pyarrow import csv
+
+    reader = csv.open_csv(file_path, convert_options=_csv_options(file_path, columns))
+    yield from _arrow_batches(reader, chunk_size, arrow_strings)
+
+def load_parquet(file_path, columns=None, arrow_strings=False):
+    """
+    Load a Parquet file into a DataFrame, reading only the requested columns from disk.
+
+    Whitespace-only strings and NA markers become missing, as in load_excel.
+
+    Args:
+        file_path (str): Path to the Parquet file.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Keep string columns Arrow-backed (string[pyarrow]).
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    table = parquet_file.read(columns=_projection(parquet_file.schema_arrow.names, columns))
+    return _arrow_frame(table, 0, arrow_strings)
+
+def iter_parquet(file_path, chunk_size=100000, columns=None, arrow_strings=False):
+    """
+    Stream a Parquet file in row batches.
+
+    Args:
+        file_path (str): Path to the Parquet file.
+        chunk_size (int): Number of data rows per batch.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Keep string columns Arrow-backed (string[pyarrow]).
+
+    Yields:
+        pd.DataFrame: Consecutive batches indexed by global row position.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    record_batches = parquet_file.iter_batches(
+        batch_size=chunk_size, columns=_projection(parquet_file.schema_arrow.names, columns)
+    )
+    yield from _arrow_batches(record_batches, chunk_size, arrow_strings)
+
+# Input file suffix -> (loader, batch reader)
+READERS = {
+    ".xlsx": (load_excel, iter_excel),
+    ".csv": (load_csv, iter_csv),
+    ".parquet": (load_parquet, iter_parquet)
+}
+
+def load_table(file_path, columns=None, arrow_strings=False):
+    """
+    Load an .xlsx, .csv or .parquet file into a DataFrame, picking the reader by suffix.
+
+    Args:
+        file_path (str): Path to the input file.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+    load, _ = READERS[Path(file_path).suffix.lower()]
+    return load(file_path, columns=columns, arrow_strings=arrow_strings)
+
+def iter_table(file_path, chunk_size=100000, columns=None, arrow_strings=False):
+    """
+    Stream an .xlsx, .csv or .parquet file in row batches, picking the reader by suffix.
+
+    Args:
+        file_path (str): Path to the input file.
+        chunk_size (int): Number of data rows per batch.
+        columns (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+
+    Yields:
+        pd.DataFrame: Consecutive batches indexed by global row position.
+    """
+    _, read_batches = READERS[Path(file_path).suffix.lower()]
+    yield from read_batches(file_path, chunk_size, columns=columns, arrow_strings=arrow_strings)
+
+def table_rows(file_path):
+    """
+    Count the data rows of an input file without loading it.
+
+    Args:
+        file_path (str): Path to the input file.
+
+    Returns:
+        int or None: Number of data rows, or None if it cannot be read cheaply.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".xlsx":
+        return sheet_rows(file_path)
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(file_path).metadata.num_rows
+    if suffix == ".csv":
+        # Line count; an estimate when quoted values span lines
+        lines = 0
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(2**20), b""):
+                lines += block.count(b"\n")
+        return max(lines - 1, 0)
+    return None
+
+def spool_batches(batches, directory):
+    """
+    Save row batches to a directory as they pass through.
+
+    Later passes replay the spool with read_spool instead of decoding the
+    workbook again.
+
+    Args:
+        batches (iterable): Row batches, e.g. from iter_table.
+        directory (str): Directory to write the spooled batches to.
+
+    Yields:
+        pd.DataFrame: The batches, unchanged.
+    """
+    for i, batch in enumerate(batches):
+        batch.to_pickle(Path(directory) / f"batch_{i:06d}.pkl")
+        yield batch
+
+def read_spool(directory):
+    """
+    Replay row batches saved by spool_batches, in order.
+
+    Args:
+        directory (str): Directory the batches were spooled to.
+
+    Yields:
+        pd.DataFrame: Consecutive batches indexed by global row position.
+    """
+    for path in sorted(Path(directory).glob("batch_*.pkl")):
+        yield pd.read_pickle(path)
+
+_HEADER_RE = re.compile(r'\W+')
+
+def normalize_header(name):
+    """
+    Normalize a column header for alias lookup: lowercase, punctuation and
+    runs of whitespace collapsed to single spaces.
+
+    Args:
+        name (str): Column header.
+
+    Returns:
+        str: Normalized header.
+    """
+    return _HEADER_RE.sub(' ', str(name)).strip().lower()
+
+def build_alias_index(expected):
+    """
+    Index the variations of every expected column by their normalized form.
+
+    Args:
+        expected (dict): Dictionary of expected column names and their variations.
+
+    Returns:
+        dict: Normalized variation -> expected name; a variation listed under
+            several names maps to the first of them.
+    """
+    index = {}
+    for key, variations in expected.items():
+        for variation in variations:
+            index.setdefault(normalize_header(variation), key)
+    return index
+
+# Resolved header layouts, by header_key; loaded from each cache file once per process.
+# The lock guards both and the cache files, for runs in threads of one process
+_MATCH_CACHE = {}
+_LOADED_CACHE_FILES = set()
+_MATCH_CACHE_LOCK = threading.Lock()
+
+def header_key(df_cols, expected):
+    """Hash a header layout together with the expected columns it is matched against."""
+    payload = json.dumps([list(df_cols), expected], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _load_match_cache(cache_file):
+    with _MATCH_CACHE_LOCK:
+        if cache_file in _LOADED_CACHE_FILES:
+            return
+        _LOADED_CACHE_FILES.add(cache_file)
+        try:
+            _MATCH_CACHE.update(json.loads(Path(cache_file).read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache: layouts are resolved again
+
+def _save_match_cache(cache_file, key, matched):
+    # Merge with entries other processes may have written, then replace atomically
+    # through a temporary file named per process and thread
+    path = Path(cache_file)
+    with _MATCH_CACHE_LOCK:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entries = {}
+        entries[key] = matched
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+def match_cols(df_cols, expected, cache_file=None):
+    """
+    Match DataFrame columns to expected column names using fuzzy matching.
+
+    Headers equal to a variation after normalize_header are resolved from a
+    hash index; only the rest are fuzzy matched. Resolved layouts are cached
+    in memory and, with a cache_file, on disk, so a known header layout is
+    resolved without matching.
+
+    Args:
+        df_cols (Index): DataFrame column names.
+        expected (dict): Dictionary of expected column names and their variations.
+        cache_file (str, optional): JSON file persisting resolved layouts across runs.
+
+    Returns:
+        dict: Dictionary mapping expected names to actual column names.
+    """
+    df_cols = list(df_cols)
+    # Only string headers round-trip through the JSON cache
+    cacheable = all(isinstance(col, str) for col in df_cols)
+    if cacheable:
+        key = header_key(df_cols, expected)
+        if cache_file is not None:
+            _load_match_cache(str(cache_file))
+        with _MATCH_CACHE_LOCK:
+            cached = _MATCH_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
+    from fuzzywuzzy import process
+
+    alias_index = build_alias_index(expected)
+    matched = {}
+    for col in df_cols:
+        exact = alias_index.get(normalize_header(col))
+        if exact is not None:
+            matched[exact] = col
+            continue
+        for name, variations in expected.items():
+            best, score = process.extractOne(col, variations)
+            if score >= 80:
+                matched[name] = col
+                break
+
+    if cacheable:
+        with _MATCH_CACHE_LOCK:
+            _MATCH_CACHE[key] = matched
+        if cache_file is not None:
+            _save_match_cache(str(cache_file), key, matched)
+    return dict(matched)
+
+# Initialize stopwords once at module level, from the NLTK English list bundled
+# with the repo, so importing needs neither nltk nor a download
+STOPWORDS_FILE = Path(__file__).resolve().parent / "resources" / "stopwords_english.txt"
+stop_words = set(STOPWORDS_FILE.read_text(encoding="utf-8").split())
+
+# Compiled patterns shared by the column-level preprocessing helpers
+_STOPWORD_RE = re.compile(
+    r'(?<!\S)(?:' + '|'.join(re.escape(w) for w in sorted(stop_words, key=len, reverse=True)) + r')(?!\S)'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+_SEPARATOR_RE = re.compile(r'[-*#]')
+_COMMON_WORD_RE = re.compile(r'\b(?!\d{1,2}\b)[a-zA-Z]{2,}|\d{3,}\b')
+_TOKEN_RE = re.compile(r'\w+')
+
+def _clean_text(values):
+    """
+    Lowercase, drop stopwords, and clean a Series of strings.
+
+    Args:
+        values (pd.Series): String values.
+
+    Returns:
+        pd.Series: Cleaned values.
+    """
+    text = values.str.lower()
+    text = text.str.replace(_STOPWORD_RE, '', regex=True)
+    text = text.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+    return text.str.replace(_SEPARATOR_RE, ' ', regex=True)
+
+def preprocess_text(df, col):
+    """
+    Preprocess text in a DataFrame column by lowercasing, removing stopwords, and cleaning.
+
+    Each distinct value is cleaned once and mapped back to its rows.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        col (str): Column name to process.
+
+    Returns:
+        pd.DataFrame: DataFrame with processed text column.
+    """
+    # Clean each distinct value once; Arrow-backed columns stay Arrow-backed
+    codes, values, _ = encode_column(df[col])
+    cleaned = _clean_text(pd.Series(values, dtype=object)).to_numpy(dtype=object)
+    dtype = ARROW_STRING if is_arrow_string(df[col]) else object
+    df[col] = pd.Series(cleaned[codes], index=df.index, dtype=dtype)
+    return df
+
+def _count_words(values, weights, counts=None):
+    """
+    Count candidate common words in distinct lowercase values.
+
+    Args:
+        values (iterable): Distinct values, in order of first appearance.
+        weights (iterable): Number of rows holding each value.
+        counts (Counter, optional): Running counts to update in place.
+
+    Returns:
+        Counter: Word counts, in order of first appearance.
+    """
+    counts = Counter() if counts is None else counts
+    for value, weight in zip(values, weights):
+        for word in _COMMON_WORD_RE.findall(value):
+            counts[word] += int(weight)
+    return counts
+
+def select_common_words(counts):
+    """
+    Select the top 10% most common words from word counts.
+
+    Args:
+        counts (Counter): Word counts, in order of first appearance.
+
+    Returns:
+        list: List of common words.
+    """
+    top_10 = int(len(counts) * 0.1) or 1
+    return [word for word, _ in counts.most_common(top_10)]
+
+def count_common_words(series, counts=None):
+    """
+    Count candidate common words in a raw column, as preprocess_text would see it.
+
+    Calling this on consecutive batches of a column gives the same counts as
+    calling it once on the whole column.
+
+    Args:
+        series (pd.Series): Raw column values.
+        counts (Counter, optional): Running counts to update in place.
+
+    Returns:
+        Counter: Word counts, in order of first appearance.
+    """
+    codes, uniques = pd.factorize(as_text(series))
+    cleaned = _clean_text(pd.Series(uniques, dtype=object))
+    return _count_words(cleaned, np.bincount(codes, minlength=len(uniques)), counts)
+
+def get_common_words(df, col):
+    """
+    Extract the top 10% most common words from a column, excluding short numbers.
+
+    Tokens are counted once per distinct value and weighted by how often the
+    value occurs, in order of first appearance so ties rank as before.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        col (str): Column name to analyze.
+
+    Returns:
+        list: List of common words.
+    """
+    values = as_text(df[col].dropna()).str.lower()
+    codes, uniques = pd.factorize(values)
+    return select_common_words(_count_words(uniques, np.bincount(codes, minlength=len(uniques))))
+
+def replace_words(text, common):
+    """
+    Replace words in text with patterns (e.g., 'CW' for common words).
+
+    Args:
+        text (str): Input text.
+        common (list): List of common words.
+
+    Returns:
+        str: Processed text with replacements.
+    """
+    def transform(word):
+        if word in common:
+            return "CW"
+        if word.isalpha():
+            return f"t{len(word)}"
+        if word.isdigit():
+            return f"n{len(word)}"
+        if any(c.isalpha() for c in word) and any(c.isdigit() for c in word):
+            text_part = "".join(c for c in word if c.isalpha())
+            num_part = "".join(c for c in word if c.isdigit())
+            return f"t{len(text_part)}n{len(num_part)}"
+        return word
+    words = re.findall(r'\w+', text)
+    i = 0
+    result = []
+    while i < len(words):
+        result.append(transform(words[i]))
+        i += 1
+    return " ".join(result)
+
+def normalize_pattern(text):
+    """
+    Normalize text by replacing tX and nX patterns.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        str: Normalized text.
+    """
+    text = re.sub(r'\bt\d+\b', 'tX', text)
+    text = re.sub(r'\bn\d+\b', 'nX', text)
+    return text
+
+def encode_column(series):
+    """
+    Encode a column compactly as its distinct values and per-row codes.
+
+    Args:
+        series (pd.Series): Raw column values.
+
+    Returns:
+        tuple: (codes, values, weights) where ``values`` holds the distinct string
+            values in order of first appearance, ``codes`` the position of each
+            row's value in it and ``weights`` the number of rows per value.
+            ``values`` is an object array, or an Arrow-backed string array for
+            Arrow-backed columns, so Python strings are only created for the
+            values of the column being fingerprinted.
+    """
+    codes, uniques = pd.factorize(as_text(series))
+    values = uniques if is_arrow_string(series) else np.asarray(uniques, dtype=object)
+    return codes, values, np.bincount(codes, minlength=len(uniques))
+
+def merge_encoded(parts):
+    """
+    Merge encode_column results of consecutive row chunks of one column.
+
+    Args:
+        parts (list): (codes, values, weights) of each chunk, in row order.
+
+    Returns:
+        tuple: (codes, values, weights), the same as encode_column on the whole column.
+    """
+    # Factorizing the chunks' values in order keeps the order of first appearance
+    ids, values = pd.factorize(np.concatenate([chunk_values for _, chunk_values, _ in parts]))
+    weights = np.bincount(
+        ids, weights=np.concatenate([chunk_weights for _, _, chunk_weights in parts]), minlength=len(values)
+    ).astype(np.int64)
+    codes = []
+    start = 0
+    for chunk_codes, chunk_values, _ in parts:
+        codes.append(ids[start:start + len(chunk_values)][chunk_codes])
+        start += len(chunk_values)
+    return np.concatenate(codes), np.asarray(values, dtype=object), weights
+
+def value_signatures(values, weights, common=None):
+    """
+    Compute the normalized pattern signature of distinct column values.
+
+    Args:
+        values (np.ndarray): Distinct string values, in order of first appearance.
+        weights (np.ndarray): Number of rows holding each value.
+        common (list, optional): Common words to use instead of the ones found
+            in ``values``.
+
+    Returns:
+        np.ndarray: Signature for each value.
+    """
+    cleaned = _clean_text(pd.Series(values, dtype=object))
+    if common is None:
+        common = select_common_words(_count_words(cleaned, weights))
+    common = set(common)
+
+    tokens = {}
+    def transform(word):
+        token = tokens.get(word)
+        if token is None:
+            token = tokens[word] = normalize_pattern(replace_words(word, common))
+        return token
+
+    return np.array(
+        [" ".join(transform(word) for word in _TOKEN_RE.findall(text)) for text in cleaned],
+        dtype=object
+    )
+
+def signature_series(codes, signatures, index=None, name=None):
+    """
+    Map per-value signatures back to rows as a categorical Series.
+
+    Args:
+        codes (np.ndarray): Per-row codes from encode_column.
+        signatures (np.ndarray): Signature for each distinct value.
+        index (pd.Index, optional): Row index of the column.
+        name (str, optional): Column name.
+
+    Returns:
+        pd.Series: Categorical signatures with sorted categories.
+    """
+    signature_codes, categories = pd.factorize(signatures, sort=True)
+    return pd.Series(
+        pd.Categorical.from_codes(signature_codes[codes], categories),
+        index=index,
+        name=name
+    )
+
+def signature_counts(signatures, weights):
+    """
+    Count rows per signature from the row counts of the distinct values.
+
+    Args:
+        signatures (np.ndarray): Signature for each distinct value.
+        weights (np.ndarray): Number of rows holding each value.
+
+    Returns:
+        np.ndarray: Number of rows per signature, in the category order of signature_series.
+    """
+    signature_codes, categories = pd.factorize(signatures, sort=True)
+    return np.bincount(signature_codes, weights=weights, minlength=len(categories)).astype(np.int64)
+
+def pattern_signatures(series, common=None):
+    """
+    Compute the normalized pattern signature of every value in a column.
+
+    Fuses preprocess_text, get_common_words, replace_words and normalize_pattern
+    into one pass over the column's distinct values. Token transforms are
+    memoized and the signatures are mapped back to rows via factorized codes.
+
+    Args:
+        series (pd.Series): Raw column values.
+        common (list, optional): Common words to use instead of the ones found
+            in ``series``, e.g. from select_common_words over a whole sheet.
+
+    Returns:
+        pd.Series: Categorical signatures aligned with the input, with sorted
+            categories, ready to pass to Pattern.pattern_clustering.
+    """
+    codes, values, weights = encode_column(series)
+    return signature_series(codes, value_signatures(values, weights, common), series.index, series.name)
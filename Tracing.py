@@ -0,0 +1,219 @@
+"""Nested timing spans for the pipeline stages, with JSON-lines and cProfile output."""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Span:
+    """
+    One timed unit of work, e.g. a stage or one column within a stage.
+
+    Attributes:
+        name (str): Span name, e.g. "pattern" or "pattern:Email".
+        attrs (dict): Counters such as rows, issues, bytes_read and bytes_written; in
+            memory mode also mem_peak and mem_retained, in bytes allocated above what
+            was allocated when the span started.
+        start (float): Start time, seconds since the epoch.
+        duration (float): Wall time in seconds.
+        children (list): Nested spans, in start order.
+    """
+
+    def __init__(self, name, attrs=None, start=None, duration=None):
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.start = time.time() if start is None else start
+        self.duration = duration
+        self.children = []
+        self._mem_start = 0
+        self._mem_peak = 0
+
+    def set(self, **attrs):
+        """Add or update counters of the span."""
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            **self.attrs,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+
+class Profile:
+    """Finished spans of a run, as a tree of Span objects."""
+
+    def __init__(self, spans):
+        self.spans = spans
+
+    def walk(self):
+        """Yield (depth, span) for all spans, depth first."""
+        stack = [(0, span) for span in reversed(self.spans)]
+        while stack:
+            depth, span = stack.pop()
+            yield depth, span
+            stack.extend((depth + 1, child) for child in reversed(span.children))
+
+    def find(self, name):
+        """Return the first span with the given name, or None."""
+        return next((span for _, span in self.walk() if span.name == name), None)
+
+    def to_dict(self):
+        return {"spans": [span.to_dict() for span in self.spans]}
+
+    def memory_report(self, top=15):
+        """
+        Summarize memory mode spans: the largest peaks and retained allocations,
+        and the in-memory size of each column where it was recorded.
+
+        Args:
+            top (int): Number of spans listed per table.
+
+        Returns:
+            str: Plain-text report.
+        """
+        spans = [(depth, span) for depth, span in self.walk() if "mem_peak" in span.attrs]
+        lines = [f"{'span':<40} {'peak MB':>10} {'retained MB':>12} {'seconds':>9}"]
+        for title, key in (("Peak allocation", "mem_peak"), ("Retained after span", "mem_retained")):
+            lines.append(f"-- {title}")
+            for _, span in sorted(spans, key=lambda item: item[1].attrs[key], reverse=True)[:top]:
+                lines.append(
+                    f"{span.name:<40} {span.attrs['mem_peak'] / 2**20:>10.1f} "
+                    f"{span.attrs['mem_retained'] / 2**20:>12.1f} {span.duration:>9.3f}"
+                )
+        for _, span in self.walk():
+            column_bytes = span.attrs.get("column_bytes")
+            if column_bytes:
+                lines.append(f"-- Column memory after {span.name} (deep), {sum(column_bytes.values()) / 2**20:.1f} MB total")
+                for col, size in sorted(column_bytes.items(), key=lambda item: item[1], reverse=True):
+                    lines.append(f"{str(col):<40} {size / 2**20:>10.1f}")
+        return "\n".join(lines)
+
+    def write_memory_report(self, path, top=15):
+        """Write memory_report to a text file."""
+        Path(path).write_text(self.memory_report(top) + "\n", encoding="utf-8")
+
+    def __str__(self):
+        lines = []
+        for depth, span in self.walk():
+            counters = " ".join(f"{key}={value}" for key, value in span.attrs.items())
+            lines.append(f"{'  ' * depth}{span.name:<{40 - 2 * depth}} {span.duration:9.3f} s  {counters}")
+        return "\n".join(lines)
+
+
+class Tracer:
+    """
+    Record nested spans while the pipeline runs.
+
+    Args:
+        sink (str or file, optional): JSON-lines file, or open text file, that each
+            span is written to as it finishes.
+        cprofile_stage (str, optional): Name of a span to run under cProfile.
+        cprofile_dir (str): Directory for the "<span>.prof" stats file.
+        memory (bool): Track allocations with tracemalloc and record each span's
+            peak and retained memory; slows the run down.
+    """
+
+    def __init__(self, sink=None, cprofile_stage=None, cprofile_dir=".", memory=False):
+        self.spans = []
+        self._stack = []
+        self._sink = open(sink, "a", encoding="utf-8") if isinstance(sink, (str, Path)) else sink
+        self._owns_sink = isinstance(sink, (str, Path))
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_dir = Path(cprofile_dir)
+        self.memory = memory
+        self._owns_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    def _memory_enter(self, span):
+        current, peak = tracemalloc.get_traced_memory()
+        # Fold the peak so far into the open spans before it is reset for this one
+        for parent in self._stack:
+            parent._mem_peak = max(parent._mem_peak, peak)
+        tracemalloc.reset_peak()
+        span._mem_start = span._mem_peak = current
+
+    def _memory_exit(self, span):
+        current, peak = tracemalloc.get_traced_memory()
+        span._mem_peak = max(span._mem_peak, peak)
+        if self._stack:
+            self._stack[-1]._mem_peak = max(self._stack[-1]._mem_peak, span._mem_peak)
+        tracemalloc.reset_peak()
+        span.set(mem_peak=span._mem_peak - span._mem_start, mem_retained=current - span._mem_start)
+
+    def _attach(self, span):
+        (self._stack[-1].children if self._stack else self.spans).append(span)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        Time the enclosed block as a span nested in the current one.
+
+        Yields:
+            Span: The span, to add counters to with Span.set.
+        """
+        span = Span(name, attrs)
+        self._attach(span)
+        if self.memory:
+            self._memory_enter(span)
+        self._stack.append(span)
+        profiler = cProfile.Profile() if name == self.cprofile_stage else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield span
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            span.duration = time.perf_counter() - start
+            self._stack.pop()
+            if self.memory:
+                self._memory_exit(span)
+            if profiler is not None:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                stats_file = self.cprofile_dir / f"{name.replace(':', '_')}.prof"
+                profiler.dump_stats(stats_file)
+                span.set(cprofile=str(stats_file))
+            self._emit(span)
+
+    def record(self, name, duration, **attrs):
+        """Add an already-timed span, e.g. one measured in a worker process, to the current span."""
+        span = Span(name, attrs, start=time.time() - duration, duration=duration)
+        self._attach(span)
+        self._emit(span)
+        return span
+
+    def _emit(self, span):
+        if self._sink is None:
+            return
+        path = [parent.name for parent in self._stack] + [span.name]
+        record = {"span": "/".join(path), "name": span.name, "depth": len(self._stack),
+                  "start": span.start, "duration": span.duration, **span.attrs}
+        self._sink.write(json.dumps(record, default=str) + "\n")
+        self._sink.flush()
+
+    def profile(self):
+        """Return the spans recorded so far as a Profile."""
+        return Profile(list(self.spans))
+
+    def close(self):
+        """Close the sink file and stop tracemalloc if the tracer started them."""
+        if self._owns_sink and self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,163 @@
+"""Benchmark each pipeline stage on synthetic sheets of increasing size.
+
+For every size, a synthetic sheet (benchmarks/synthetic.py) is loaded and
+run through main.validate_frame and main.write_output, the stages of
+main.main's in-memory path, with a Tracer; the time and throughput of each
+stage span are saved as JSON. Sizes above the .xlsx row limit skip the load
+and write stages and start from the generated DataFrame.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes N ...] [--error-rate R]
+        [--output FILE] [--compare BASELINE.json]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from synthetic import EXCEL_MAX_ROWS, generate, write_workbook
+from Text_PreProc import load_excel
+from Tracing import Tracer
+from main import validate_frame, write_output
+
+DEFAULT_SIZES = [10000, 100000, 1000000, 5000000]
+
+# Top-level spans of validate_frame and write_output, plus "signatures", the
+# preprocessing step within "pattern"
+STAGES = ["load", "match_cols", "signatures", "pattern", "validate", "fill_ratio", "colors", "write"]
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _stage(span, n_rows, n_cols):
+    # Time and throughput of one stage span; spans that record their columns use them
+    seconds = span.duration
+    n_cols = span.attrs.get("columns", n_cols)
+    print(f"  {span.name:<11}{seconds:>10.3f} s{n_rows / seconds if seconds else 0:>14,.0f} rows/s")
+    return {
+        "seconds": seconds,
+        "rows_per_s": n_rows / seconds if seconds else None,
+        "cells_per_s": n_rows * n_cols / seconds if seconds else None
+    }
+
+
+def run_size(n_rows, error_rate, seed, data_dir, writer):
+    """
+    Run all stages on one synthetic sheet.
+
+    Args:
+        n_rows (int): Rows in the sheet.
+        error_rate (float): Fraction of invalid cells per column.
+        seed (int): Random seed for the generator.
+        data_dir (Path): Directory for the generated workbook and output.
+        writer (str): Excel_Handler writer backend for the write stage.
+
+    Returns:
+        dict: Stage name -> {"seconds", "rows_per_s", "cells_per_s"}; skipped
+            stages map to {"skipped": reason}.
+    """
+    stages = {}
+    df = generate(n_rows, error_rate=error_rate, seed=seed)
+    n_cols = len(df.columns)
+    fits_excel = n_rows <= EXCEL_MAX_ROWS
+    tracer = Tracer()
+
+    if fits_excel:
+        input_file = data_dir / f"synthetic_{n_rows}_{error_rate}_{seed}.xlsx"
+        if not input_file.exists():
+            print(f"  generating {input_file.name}")
+            write_workbook(df, input_file)
+        with tracer.span("load", rows=n_rows):
+            df = load_excel(str(input_file))
+    else:
+        stages["load"] = {"skipped": f"more than {EXCEL_MAX_ROWS} rows"}
+
+    results = validate_frame(df, tracer=tracer)
+    if fits_excel:
+        write_output(df, results, data_dir / "output.xlsx", n_rows, writer=writer, tracer=tracer)
+    else:
+        stages["write"] = {"skipped": f"more than {EXCEL_MAX_ROWS} rows"}
+    del results
+
+    spans = {span.name: span for span in tracer.spans}
+    pattern = spans.get("pattern")
+    for child in pattern.children if pattern else []:
+        if child.name == "signatures":
+            spans["signatures"] = child
+    for name in STAGES:
+        if name in spans:
+            stages[name] = _stage(spans[name], n_rows, n_cols)
+    return stages
+
+
+def compare(results, baseline):
+    """Print each stage's speedup over a baseline results file (> 1 is faster)."""
+    baseline_runs = {run["rows"]: run["stages"] for run in baseline["runs"]}
+    print(f"\nCompared with {baseline.get('commit', '?')}:")
+    for run in results["runs"]:
+        before = baseline_runs.get(run["rows"])
+        if before is None:
+            continue
+        ratios = []
+        for name in STAGES:
+            old, new = before.get(name, {}), run["stages"].get(name, {})
+            if old.get("seconds") and new.get("seconds"):
+                ratios.append(f"{name} {old['seconds'] / new['seconds']:.2f}x")
+        print(f"  {run['rows']:>9,} rows: " + ", ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="rows per synthetic sheet")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of invalid cells per column")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--writer", default="write_only", help="Excel_Handler writer backend")
+    parser.add_argument("--data-dir", help="keep generated workbooks here to reuse them across runs")
+    parser.add_argument("--output", help="results JSON file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON of another commit to compare with")
+    args = parser.parse_args()
+
+    commit = _commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+        "writer": args.writer,
+        "runs": []
+    }
+    with tempfile.TemporaryDirectory(prefix="data_issue_bench_") as tmp:
+        data_dir = Path(args.data_dir) if args.data_dir else Path(tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for n_rows in args.sizes:
+            print(f"{n_rows:,} rows")
+            results["runs"].append({"rows": n_rows, "stages": run_size(n_rows, args.error_rate, args.seed, data_dir, args.writer)})
+
+    output = Path(args.output) if args.output else REPO_ROOT / "benchmarks" / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark cold-start import time of the pipeline modules.
+
+Each module is imported in a fresh interpreter, as a short-lived batch
+worker would, and the median wall time over several runs is reported.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--importtime MODULE]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ["Config", "Column_Cache", "Issue_Store", "Text_PreProc", "Pattern", "Logical", "Data_Type", "Excel_Handler", "main"]
+
+# Heavy dependencies that should only be imported when first used
+LAZY = ["nltk", "fuzzywuzzy", "unidecode", "openpyxl"]
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {lazy!r} if name in sys.modules))
+"""
+
+
+def time_import(module, repeat=5):
+    """
+    Import a module in fresh interpreters and time it.
+
+    Args:
+        module (str): Module name, importable from the repo root.
+        repeat (int): Number of fresh interpreters to time.
+
+    Returns:
+        tuple: (median seconds, heavy dependencies imported eagerly)
+    """
+    times = []
+    eager = ""
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, lazy=LAZY)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        elapsed, _, eager = result.stdout.strip().partition(" ")
+        times.append(float(elapsed))
+    return statistics.median(times), eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--importtime", metavar="MODULE", help="print python -X importtime output for MODULE")
+    args = parser.parse_args()
+
+    if args.importtime:
+        subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {args.importtime}"], cwd=REPO_ROOT, check=True)
+        return
+
+    print(f"{'module':<16}{'import (ms)':>12}  eager heavy imports")
+    for module in MODULES:
+        seconds, eager = time_import(module, args.repeat)
+        print(f"{module:<16}{seconds * 1000:>12.1f}  {eager or '-'}")
+
+
+if __name__ == "__main__":
+    main()
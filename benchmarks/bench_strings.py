@@ -0,0 +1,195 @@
+"""Benchmark object strings against Arrow-backed strings (main's arrow_strings mode).
+
+For every size, a synthetic sheet (benchmarks/synthetic.py) is saved as CSV
+and run through the load, pattern and validate stages once per string mode,
+each in a fresh interpreter so peak memory is measured per mode. Reported
+per mode: stage times, the resident memory the loaded columns take and the
+process's peak resident memory (Linux; resident sizes are read from /proc).
+
+The resident size is measured rather than DataFrame.memory_usage(deep=True),
+which counts a Python string shared by many cells once per cell. Use
+--pool-size to control how many distinct values each column holds.
+
+Before timing, both modes validate a --check-rows sheet and their issue
+reports must be identical; the run stops if they differ.
+
+Usage:
+    python benchmarks/bench_strings.py [--sizes N ...] [--error-rate R] [--pool-size N]
+        [--check-rows N] [--output FILE]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from bench_pipeline import _commit
+from synthetic import POOL_SIZE, generate
+
+DEFAULT_SIZES = [100000, 1000000]
+
+CHECK_ROWS = 20000
+
+MODES = {"object": False, "pyarrow": True}
+
+STAGES = ["load", "pattern", "validate"]
+
+
+def _resident():
+    """Current resident memory of this process in bytes, after a garbage collection."""
+    import pyarrow as pa
+
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def run_mode(input_file, mode):
+    """
+    Load and validate a CSV file in one string mode, in this process.
+
+    Args:
+        input_file (str): CSV file from generate.
+        mode (str): Key of MODES.
+
+    Returns:
+        dict: Seconds per stage, column_bytes (resident memory added by the
+            loaded columns) and peak_rss, in bytes.
+    """
+    from Config import EXPECTED_COLS
+    from Text_PreProc import load_csv, match_cols
+    from main import discover_patterns, validate_matched
+
+    result = {}
+    before = _resident()
+    start = time.perf_counter()
+    df = load_csv(input_file, arrow_strings=MODES[mode])
+    result["load"] = time.perf_counter() - start
+    result["column_bytes"] = _resident() - before
+
+    start = time.perf_counter()
+    discover_patterns(df)
+    result["pattern"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validate_matched(df, match_cols(df.columns, EXPECTED_COLS))
+    result["validate"] = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss"] = peak if sys.platform == "darwin" else peak * 1024
+    return result
+
+
+def compare_modes(input_file):
+    """
+    Validate a CSV file in every string mode and compare the issue reports.
+
+    Args:
+        input_file (str): CSV file from generate.
+
+    Returns:
+        dict: Number of report rows per mode that the object mode's report
+            does not have, or has and the mode does not; 0 when they match.
+    """
+    from Config import COLORS, PRIORITIES
+    from Excel_Handler import assign_colors, issue_report
+    from Text_PreProc import load_csv
+    from main import validate_frame
+
+    reports = {}
+    for mode, arrow_strings in MODES.items():
+        df = load_csv(input_file, arrow_strings=arrow_strings)
+        (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+         dtype_indices, dtype_row_issues, fill_ratios) = validate_frame(df)
+        cell_colors = assign_colors(logical_indices, pattern_issues, dtype_indices, COLORS, PRIORITIES)
+        reports[mode] = issue_report(logical_row_issues, pattern_row_issues, dtype_row_issues, cell_colors, columns=list(fill_ratios))
+    expected = reports["object"]
+    differences = {}
+    for mode, report in reports.items():
+        merged = expected.merge(report, how="outer", indicator=True)
+        differences[mode] = int((merged["_merge"] != "both").sum())
+    return differences
+
+
+def _run_fresh(input_file, mode):
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", str(input_file), mode],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="rows per synthetic sheet")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of invalid cells per column")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="distinct valid values per column")
+    parser.add_argument("--check-rows", type=int, default=CHECK_ROWS, help="rows of the sheet the modes are compared on")
+    parser.add_argument("--output", help="results JSON file (default: benchmarks/results/strings_<commit>.json)")
+    parser.add_argument("--worker", nargs=2, metavar=("CSV", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(*args.worker)))
+        return
+
+    commit = _commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+        "pool_size": args.pool_size,
+        "runs": []
+    }
+    with tempfile.TemporaryDirectory(prefix="data_issue_bench_") as tmp:
+        check_file = Path(tmp) / "check.csv"
+        generate(args.check_rows, error_rate=args.error_rate, seed=args.seed, pool_size=args.pool_size).to_csv(check_file, index=False)
+        differences = compare_modes(check_file)
+        results["check"] = {"rows": args.check_rows, "differences": differences}
+        if any(differences.values()):
+            raise SystemExit(f"Issue reports differ between string modes: {differences}")
+        print(f"Issue reports of {args.check_rows:,} rows are identical in all modes")
+        for n_rows in args.sizes:
+            input_file = Path(tmp) / f"synthetic_{n_rows}.csv"
+            generate(n_rows, error_rate=args.error_rate, seed=args.seed, pool_size=args.pool_size).to_csv(input_file, index=False)
+            modes = {mode: _run_fresh(input_file, mode) for mode in MODES}
+            results["runs"].append({"rows": n_rows, "modes": modes})
+
+            print(f"{n_rows:,} rows")
+            print(f"  {'mode':<9}" + "".join(f"{name + ' (s)':>14}" for name in STAGES) + f"{'columns MB':>12}{'peak MB':>10}")
+            for mode, result in modes.items():
+                print(
+                    f"  {mode:<9}" + "".join(f"{result[name]:>14.3f}" for name in STAGES)
+                    + f"{result['column_bytes'] / 2**20:>12.1f}{result['peak_rss'] / 2**20:>10.1f}"
+                )
+            before, after = modes["object"], modes["pyarrow"]
+            print("  pyarrow vs object: " + ", ".join(
+                [f"{name} {before[name] / after[name]:.2f}x faster" for name in STAGES]
+                + [f"columns {before['column_bytes'] / after['column_bytes']:.2f}x smaller",
+                   f"peak {before['peak_rss'] / after['peak_rss']:.2f}x smaller"]
+            ))
+
+    output = Path(args.output) if args.output else REPO_ROOT / "benchmarks" / "results" / f"strings_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
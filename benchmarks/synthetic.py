@@ -0,0 +1,150 @@
+"""Synthetic workbooks covering every Config.EXPECTED_COLS column type.
+
+Each column is drawn from a pool of valid values for its type; a fraction
+``error_rate`` of its cells is replaced by values the validators should flag
+and a fraction ``blank_rate`` is left empty.
+
+Usage:
+    python benchmarks/synthetic.py ROWS OUTPUT.xlsx [--error-rate R] [--seed S]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from Config import EXPECTED_COLS
+
+# Rows per sheet supported by .xlsx, excluding the header
+EXCEL_MAX_ROWS = 1048575
+
+# Distinct valid values drawn per column
+POOL_SIZE = 50000
+
+FIRST_NAMES = ["John", "Alice", "Ravi", "Priya", "José", "Zoë", "Mohammed", "Anna", "Wei", "Fatima", "Olga", "Kwame"]
+LAST_NAMES = ["Smith", "Kumar", "García", "Singh", "Chen", "Okafor", "Ivanova", "Müller", "Reddy", "Nakamura"]
+STREETS = ["MG Road", "Main St", "Park Avenue", "Flat-12 #3 Lake View", "Station Road", "Church Street"]
+CITIES = ["Hyderabad", "Mumbai", "Delhi", "Pune", "Chennai", "New York", "Bangalore", "London"]
+DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y", "['%d-%m-%Y']", "%d/%m/%Y"]
+
+
+def _choice(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def _numbers(rng, low, high, size):
+    return rng.integers(low, high, size).astype(str).astype(object)
+
+
+def _dates(rng, size, start="1930-01-01", end="2020-12-31"):
+    days = rng.integers(pd.Timestamp(start).value // 86400 // 10**9, pd.Timestamp(end).value // 86400 // 10**9, size)
+    dates = pd.to_datetime(days, unit="D")
+    formats = rng.integers(0, len(DATE_FORMATS), size)
+    values = np.empty(size, dtype=object)
+    for i, fmt in enumerate(DATE_FORMATS):
+        selected = formats == i
+        values[selected] = dates[selected].strftime(fmt)
+    return values
+
+
+def _names(rng, size):
+    return _choice(rng, FIRST_NAMES, size) + " " + _choice(rng, LAST_NAMES, size)
+
+
+def _pan(rng, size):
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), dtype=object)
+    parts = [letters[rng.integers(0, 26, size)] for _ in range(5)]
+    return sum(parts[1:], parts[0]) + _numbers(rng, 1000, 10000, size) + letters[rng.integers(0, 26, size)]
+
+
+# Expected column -> (valid value pool generator, invalid values)
+GENERATORS = {
+    "DOB": (_dates, ["2050-12-01", "01-01-1850", "invalid", "[]", "31-02-1990"]),
+    "DOD": (lambda rng, size: _dates(rng, size, "1990-01-01", "2020-12-31"), ["2050-01-01", "bad", "00-00-0000"]),
+    "Phone": (lambda rng, size: _numbers(rng, 6000000000, 10000000000, size), ["12345", "abc|9441924126", "98765-4321x", "12345678901", "1234567890123", "٩٨٧٦٥٤٣٢١٠"]),
+    "pan": (_pan, ["SHORT123", "1234567890AB", "ABCDE1234X"]),
+    "Email": (
+        lambda rng, size: np.char.lower(_choice(rng, FIRST_NAMES, size).astype(str)).astype(object)
+        + _numbers(rng, 1, 1000, size) + "@example.com",
+        ["no@at", "abc@|xyz@gmail.com", "plainaddress"]
+    ),
+    "Name": (_names, ["Xy", "Effff", "Bcdfgh", "Brrrrrrr"]),
+    "Address": (
+        lambda rng, size: _numbers(rng, 1, 1000, size) + " " + _choice(rng, STREETS, size) + ", " + _choice(rng, CITIES, size),
+        ["Apt", "   ", "#1"]
+    ),
+    "SSN": (
+        lambda rng, size: _numbers(rng, 100, 1000, size) + "-" + _numbers(rng, 10, 100, size) + "-" + _numbers(rng, 1000, 10000, size),
+        ["SSN-UNKNOWN", "12-AB-3456"]
+    ),
+    "AccountNumber": (lambda rng, size: "AC" + _numbers(rng, 10**7, 10**8, size), ["X-1", "???", "ACCT"]),
+    "Gender": (lambda rng, size: _choice(rng, ["M", "F", "Male", "Female"], size), ["X1", "Unknown?", "123"]),
+    "ZipCode": (lambda rng, size: _numbers(rng, 10000, 100000, size), ["ABCDE", "560 001", "1"]),
+    "City": (lambda rng, size: _choice(rng, CITIES, size), ["12345", "C1ty", "   "])
+}
+
+
+def _text(rng, size):
+    return _choice(rng, ["the quick brown fox", "item 42 in the box", "see notes", "a-b*c#d"], size)
+
+
+def generate(n_rows, error_rate=0.05, blank_rate=0.02, seed=0, pool_size=POOL_SIZE):
+    """
+    Generate a synthetic sheet with one column per expected column.
+
+    Args:
+        n_rows (int): Number of rows.
+        error_rate (float): Fraction of cells per column holding invalid values.
+        blank_rate (float): Fraction of cells per column left empty.
+        seed (int): Random seed.
+        pool_size (int): Distinct valid values drawn per column.
+
+    Returns:
+        pd.DataFrame: Columns named after the first variation of each expected
+            column, in Config.EXPECTED_COLS order, plus a free-text Notes column.
+    """
+    rng = np.random.default_rng(seed)
+    pool_size = min(n_rows, pool_size)
+    columns = {}
+    for key, variations in EXPECTED_COLS.items():
+        make_pool, invalid = GENERATORS.get(key, (_text, ["???"]))
+        values = make_pool(rng, pool_size)[rng.integers(0, pool_size, n_rows)]
+        draw = rng.random(n_rows)
+        errors = draw < error_rate
+        values[errors] = _choice(rng, invalid, int(errors.sum()))
+        values[(draw >= error_rate) & (draw < error_rate + blank_rate)] = None
+        columns[variations[0]] = values
+    columns["Notes"] = _text(rng, n_rows)
+    return pd.DataFrame(columns)
+
+
+def write_workbook(df, path):
+    """Write a generated sheet to .xlsx with a write-only workbook."""
+    from openpyxl import Workbook
+
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df)} rows exceed the .xlsx limit of {EXCEL_MAX_ROWS}")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        ws.append(row)
+    wb.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--blank-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_workbook(generate(args.rows, args.error_rate, args.blank_rate, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,564 @@
-# main.py
-import pandas as pd
-from pathlib import Path
-from Text_PreProc import preprocess_text, get_common_words, replace_words, normalize_pattern, load_excel, match_cols
-from Pattern import pattern_clustering
-from Logical import logical
-from Excel_Handler import assign_colors, apply_colors_to_excel
-from Data_Type import dtype
-from Config import COLORS, PRIORITIES, EXPECTED_COLS, DTYPES
-import time
-
-def main(input_file_path: str, output_file_path: str) -> str:
-    # Validate input file
-    input_file = Path(input_file_path)
-    if not input_file.exists() or not input_file.is_file() or input_file.suffix != '.xlsx':
-        print(f"Error: '{input_file}' not found or is not a valid .xlsx file!")
-        return None
-    
-    print(f"Processing file: {input_file}")
-    output_file = Path(output_file_path)
-    
-    # Ensure the output directory exists
-    output_file.parent.mkdir(exist_ok=True)
-    
-    # Load the Excel file
-    df = load_excel(str(input_file))
-    print(f" -- Loaded Excel file: {input_file}")
-    
-    # Create a copy for preprocessing
-    df_preprocessed = df.copy()
-    
-    # Match columns to expected column names
-    matched_cols = match_cols(df.columns, EXPECTED_COLS)
-    print(f" ---- Matched columns: {matched_cols}")
-    
-    # Preprocess all columns for pattern validation
-    text_cols = [col for col in df_preprocessed.columns]
-    for col in text_cols:
-        df_preprocessed = preprocess_text(df_preprocessed, col)
-        common_words = get_common_words(df_preprocessed, col)
-        df_preprocessed[col] = df_preprocessed[col].apply(
-            lambda x: normalize_pattern(replace_words(str(x), common_words))
-        )
-    
-    # Pattern discovery on all columns
-    pattern_issues = {}
-    pattern_row_issues = {}
-    for col in df_preprocessed.columns:
-        issues, updated_df, pattern_percentage_dict, row_issues = pattern_clustering(df_preprocessed, col, threshold=1.0)
-        pattern_issues[col] = issues
-        pattern_row_issues[col] = row_issues
-        df_preprocessed[col] = updated_df[col]
-    
-    print("- Pattern Done")
-    
-    # Logical validation on matched columns
-    logical_indices, logical_row_issues = logical(df, matched_cols=matched_cols)
-    print("-- Logical Done")
-    
-    # Data type validation on matched columns
-    dtype_indices, dtype_row_issues = dtype(df, DTYPES, matched_cols=matched_cols)
-    print("--- Data Type Done")
-    
-    # Fill ratio calculation
-    fill_ratios = {col: 1 - df[col].isna().mean() for col in df.columns}
-    print("---- Fill Ratio Done")
-    
-    # Assign colors based on all issues
-    cell_colors = assign_colors(logical_indices, pattern_issues, dtype_indices, COLORS, PRIORITIES)
-    print("----- Colors Saved")
-    
-    # Apply colors to Excel, add Flag and Issues columns, and freeze them
-    apply_colors_to_excel(input_file, cell_colors, fill_ratios, output_file, logical_row_issues, pattern_row_issues, dtype_row_issues)
-    
-    return str(output_file)
-
-if __name__ == "__main__":
-    from Config import Input_Folder, Output_Folder, Input_File
-    start_time = time.time()
-    input_file_path = Path(Input_Folder) / Input_File
-    output_file_path = Path(Output_Folder) / f"{input_file_path.stem}_processed.xlsx"
-    output_file = main(str(input_file_path), str(output_file_path))
-    total = time.time() - start_time
-    print(f"--- Processed in {total} seconds ---")
-    if output_file:
+# main.py
+import pandas as pd
+import numpy as np
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from datetime import datetime
+from itertools import repeat
+from Text_PreProc import encode_column, merge_encoded, value_signatures, signature_series, signature_counts, READERS, load_table, iter_table, table_rows, spool_batches, read_spool, match_cols, count_common_words, select_common_words
+from Pattern import pattern_clustering, pattern_coverage, coverage_row_issues
+from Logical import logical_column, merge_logical_results, pan_value_counts
+from Excel_Handler import assign_colors, apply_colors_to_excel, issue_report, write_issue_report, REPORT_WRITERS
+from Data_Type import dtype_column, merge_dtype_results
+from Column_Cache import ColumnCache
+from Issue_Store import IssueStore
+from Tracing import Tracer
+from Result_Cache import ResultCache, column_hash
+from Config import COLORS, PRIORITIES, EXPECTED_COLS, DTYPES, Header_Cache_File
+import time
+
+# Peak memory of a run relative to the in-memory (deep) size of the rows it holds,
+# measured with Tracer(memory=True); the in-memory openpyxl workbook dominates
+MEMORY_FACTOR = 7
+
+def estimate_memory(input_file, sample_rows=1000, columns=None, arrow_strings=False):
+    """
+    Estimate the peak memory of processing a file in memory, from a sample of rows.
+
+    Args:
+        input_file (str): Path to the .xlsx, .csv or .parquet file.
+        sample_rows (int): Number of rows to sample.
+        columns (list, optional): Only these columns are read.
+        arrow_strings (bool): Text columns are stored as Arrow-backed strings.
+
+    Returns:
+        tuple: (estimated peak bytes, deep bytes per row)
+    """
+    sample = next(iter_table(input_file, sample_rows, columns=columns, arrow_strings=arrow_strings), None)
+    if sample is None:
+        return 0, 0
+    bytes_per_row = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    n_rows = table_rows(input_file) or len(sample)
+    return int(bytes_per_row * n_rows * MEMORY_FACTOR), bytes_per_row
+
+def _merge_indices(merged, indices):
+    for col, rows in indices.items():
+        merged.setdefault(col, []).extend(rows)
+
+def _no_progress(stage, done, total, detail=None):
+    # Default progress callback: progress(stage, done, total, detail) is called as
+    # each stage starts and as its steps (e.g. columns) finish
+    pass
+
+def _executor(workers, kind="process"):
+    # Worker pool for workers > 1 ("process" or "thread"), otherwise a no-op context
+    if not (workers and workers > 1):
+        return nullcontext()
+    return (ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor)(max_workers=workers)
+
+def _validate_column(expected_col, series, today, pan_counts=None, cache=None):
+    # Logical and data type checks of one column, sharing its parsed values;
+    # also returns the issue count and time taken, for tracing
+    start = time.perf_counter()
+    cache = ColumnCache(series.to_frame()) if cache is None else cache
+    logical_result = logical_column(expected_col, series, today, cache, pan_counts)
+    dtype_result = dtype_column(expected_col, DTYPES[expected_col], series, cache) if expected_col in DTYPES else None
+    issues = 0
+    if logical_result is not None:
+        issues += len(logical_result[0]) + len(logical_result[1] or [])
+    if dtype_result is not None:
+        issues += int(np.count_nonzero(dtype_result[0]))
+    return logical_result, dtype_result, issues, time.perf_counter() - start
+
+def validate_matched(df, matched_cols, pool=None, pan_counts=None, tracer=None, result_cache=None, column_hashes=None,
+                     progress=None):
+    """
+    Run the logical and data type checks on the matched columns.
+
+    Each matched column is one task that runs both checks; with a pool the
+    tasks run in parallel. Results are merged in matched_cols order, so they
+    do not depend on scheduling.
+
+    Args:
+        df (pd.DataFrame): Loaded sheet or row batch.
+        matched_cols (dict): Mapping of expected column names to actual column names.
+        pool (Executor, optional): Thread or process pool; serial when None.
+        pan_counts (Counter, optional): PAN counts over the whole sheet.
+        tracer (Tracer, optional): Records a "validate:<column>" span per column.
+        result_cache (ResultCache, optional): Per-column results of earlier runs; only
+            columns not found in it are checked. Not used with pan_counts, which
+            depend on other batches.
+        column_hashes (dict, optional): column_hash of each column, if already computed.
+        progress (callable, optional): Called as progress("validate", done, total, column)
+            as each column's checks finish.
+
+    Returns:
+        tuple: (logical_indices, logical_row_issues, dtype_indices, dtype_row_issues)
+    """
+    progress = _no_progress if progress is None else progress
+    today = pd.Timestamp(datetime.today().date())
+    expected_cols = list(matched_cols)
+    actual_cols = [matched_cols[expected_col] for expected_col in expected_cols]
+    if pan_counts is not None:
+        result_cache = None
+
+    # Results depend on the column, its role and, for date checks, today's date
+    keys = [None] * len(expected_cols)
+    results = [None] * len(expected_cols)
+    if result_cache is not None:
+        column_hashes = column_hashes or {}
+        for i, (expected_col, actual_col) in enumerate(zip(expected_cols, actual_cols)):
+            content_hash = column_hashes.get(actual_col) or column_hash(df[actual_col])
+            keys[i] = result_cache.key(content_hash, expected_col, today.date())
+            results[i] = result_cache.get(keys[i])
+    todo = [i for i, result in enumerate(results) if result is None]
+    progress("validate", len(expected_cols) - len(todo), len(expected_cols))
+
+    # Serially, all columns share one cache of parsed values
+    caches = repeat(ColumnCache(df)) if pool is None else repeat(None)
+    computed = (map if pool is None else pool.map)(
+        _validate_column,
+        [expected_cols[i] for i in todo],
+        [df[actual_cols[i]] for i in todo],
+        repeat(today),
+        [pan_counts if expected_cols[i] == "pan" else None for i in todo],
+        caches
+    )
+    for done, (i, result) in enumerate(zip(todo, computed), len(expected_cols) - len(todo) + 1):
+        results[i] = result
+        if result_cache is not None:
+            result_cache.put(keys[i], result)
+        progress("validate", done, len(expected_cols), actual_cols[i])
+    if tracer is not None:
+        fresh = set(todo)
+        for i, (actual_col, (_, _, issues, seconds)) in enumerate(zip(actual_cols, results)):
+            if i in fresh:
+                tracer.record(f"validate:{actual_col}", seconds, rows=len(df), issues=issues)
+            else:
+                tracer.record(f"validate:{actual_col}", 0.0, rows=len(df), issues=issues, cached=True)
+    logical_indices, logical_row_issues = merge_logical_results(matched_cols, [result[0] for result in results])
+    dtype_indices, dtype_row_issues = merge_dtype_results(df.index, matched_cols, [result[1] for result in results])
+    return logical_indices, logical_row_issues, dtype_indices, dtype_row_issues
+
+def discover_patterns(df, workers=None, split_rows=None, tracer=None, result_cache=None, column_hashes=None,
+                      progress=None):
+    """
+    Run pattern discovery on all columns, evaluating each distinct value once.
+
+    With more than one worker, columns are shipped to a process pool as their
+    distinct values and row counts only; the signatures that come back are
+    mapped to rows and clustered here, in column order, so results do not
+    depend on scheduling. Columns longer than split_rows are also factorized
+    as row chunks in the pool, and the partial tables merged. Rows per pattern
+    are summed from the row counts of the distinct values, without another
+    pass over the rows.
+
+    Args:
+        df (pd.DataFrame): Loaded sheet.
+        workers (int, optional): Number of worker processes; serial when None or 1.
+        split_rows (int, optional): Rows per chunk for map-reduce counting within a column.
+        tracer (Tracer, optional): Records "signatures" and per-column "pattern:<column>" spans.
+        result_cache (ResultCache, optional): Per-column results of earlier runs; only
+            columns not found in it are clustered.
+        column_hashes (dict, optional): column_hash of each column, if already computed.
+        progress (callable, optional): Called as progress("pattern", done, total, column)
+            as each column is clustered.
+
+    Returns:
+        tuple: (pattern_issues, pattern_row_issues) keyed by column.
+    """
+    tracer = Tracer() if tracer is None else tracer
+    progress = _no_progress if progress is None else progress
+    pattern_issues = {}
+    pattern_row_issues = {}
+    keys = {}
+    if result_cache is not None:
+        column_hashes = column_hashes or {}
+        for col in df.columns:
+            keys[col] = result_cache.key(column_hashes.get(col) or column_hash(df[col]), "pattern")
+            cached = result_cache.get(keys[col])
+            if cached is not None:
+                pattern_issues[col], pattern_row_issues[col] = cached
+                tracer.record(f"pattern:{col}", 0.0, rows=len(df), issues=len(cached[0]), cached=True)
+    columns = [col for col in df.columns if col not in pattern_issues]
+    progress("pattern", len(df.columns) - len(columns), len(df.columns))
+    with _executor(workers if columns else None) as pool:
+        map_func = map if pool is None else pool.map
+        with tracer.span("signatures", rows=len(df), columns=len(columns)) as span:
+            if split_rows and len(df) > split_rows:
+                starts = range(0, len(df), split_rows)
+                chunks = [df[col].iloc[start:start + split_rows] for col in columns for start in starts]
+                parts = list(map_func(encode_column, chunks))
+                encoded = [merge_encoded(parts[i:i + len(starts)]) for i in range(0, len(parts), len(starts))]
+            else:
+                encoded = [encode_column(df[col]) for col in columns]
+            values = [column_values for _, column_values, _ in encoded]
+            weights = [column_weights for _, _, column_weights in encoded]
+            signatures = list(map_func(value_signatures, values, weights))
+            span.set(distinct_values=sum(len(column_values) for column_values in values))
+
+        for done, (col, (codes, _, column_weights), column_signatures) in enumerate(
+                zip(columns, encoded, signatures), len(df.columns) - len(columns) + 1):
+            with tracer.span(f"pattern:{col}", rows=len(df)) as span:
+                series = signature_series(codes, column_signatures, df.index, col)
+                issues, _, _, row_issues = pattern_clustering(
+                    series.to_frame(), col, threshold=1.0, counts=signature_counts(column_signatures, column_weights)
+                )
+                pattern_issues[col] = issues
+                pattern_row_issues[col] = row_issues
+                span.set(patterns=len(series.cat.categories), issues=len(issues))
+                if result_cache is not None:
+                    result_cache.put(keys[col], (issues, row_issues))
+            progress("pattern", done, len(df.columns), col)
+    # Cached and fresh results, in column order
+    return ({col: pattern_issues[col] for col in df.columns},
+            {col: pattern_row_issues[col] for col in df.columns})
+
+def _batch_signatures(batch, columns, common_words, pool=None):
+    # Encode the given columns of a batch and compute their values' signatures,
+    # with the sheet-wide common words; signatures run in the pool if given
+    encoded = [encode_column(batch[col]) for col in columns]
+    signatures = (map if pool is None else pool.map)(
+        value_signatures,
+        [values for _, values, _ in encoded],
+        [weights for _, _, weights in encoded],
+        [common_words[col] for col in columns]
+    )
+    return encoded, list(signatures)
+
+def stream_validate(input_file, chunk_size, spool_dir, workers=None, validation_executor="process", tracer=None,
+                    usecols=None, arrow_strings=False):
+    """
+    Run pattern, logical and data type validation over row batches of an input file.
+
+    The first pass collects sheet-wide statistics (common words per column, PAN
+    counts, fill counts). The second pass runs the logical and data type checks
+    batch by batch and counts the rows of each pattern over the whole sheet.
+    A last pass replays the batches to flag the rows of patterns below the
+    coverage threshold, only for columns that have such patterns. Only one
+    batch of rows is held as a DataFrame at a time, memory per column grows
+    with its patterns rather than its rows, and the input is decoded once:
+    the first pass spools the batches for the others.
+
+    Args:
+        input_file (str): Path to the .xlsx, .csv or .parquet file.
+        chunk_size (int): Number of rows per batch.
+        spool_dir (str): Directory to spool decoded batches to; replay it with
+            read_spool to write the output.
+        workers (int, optional): Number of workers for pattern signatures and validators.
+        validation_executor (str): "process" or "thread" pool for the validators.
+        tracer (Tracer, optional): Records "scan", "validate" (one span per batch),
+            "pattern" (one span per column) and "classify" (one span per batch) spans.
+        usecols (list, optional): Only read these columns.
+        arrow_strings (bool): Store text columns as Arrow-backed strings.
+
+    Returns:
+        tuple: (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+            dtype_indices, dtype_row_issues, fill_ratios), as built by main.
+    """
+    tracer = Tracer() if tracer is None else tracer
+
+    # First pass: sheet-wide statistics
+    columns = None
+    matched_cols = {}
+    word_counts = {}
+    non_null = {}
+    pan_counts = None
+    n_rows = 0
+    with tracer.span("scan", bytes_read=Path(input_file).stat().st_size) as span:
+        for batch in spool_batches(iter_table(input_file, chunk_size, columns=usecols, arrow_strings=arrow_strings), spool_dir):
+            if columns is None:
+                columns = batch.columns
+                matched_cols = match_cols(columns, EXPECTED_COLS, cache_file=Header_Cache_File)
+                print(f" ---- Matched columns: {matched_cols}")
+                word_counts = {col: Counter() for col in columns}
+                non_null = dict.fromkeys(columns, 0)
+                if "pan" in matched_cols:
+                    pan_counts = Counter()
+            for col in columns:
+                count_common_words(batch[col], word_counts[col])
+                non_null[col] += int(batch[col].notna().sum())
+            if pan_counts is not None:
+                pan_value_counts(batch[matched_cols["pan"]], pan_counts)
+            n_rows += len(batch)
+        span.set(rows=n_rows)
+    if columns is None:
+        return {}, {}, {}, IssueStore(), {}, IssueStore(), {}
+    common_words = {col: select_common_words(word_counts[col]) for col in columns}
+    print(f" -- Scanned {n_rows} rows")
+
+    # Second pass: per-batch checks and pattern counts
+    logical_indices, logical_row_issues = {}, IssueStore()
+    dtype_indices, dtype_row_issues = {}, IssueStore()
+    signature_ids = {col: {} for col in columns}
+    pattern_counts = {col: np.zeros(0, dtype=np.int64) for col in columns}
+    with _executor(workers) as pool:
+        with _executor(workers, validation_executor) as validation_pool, tracer.span("validate", rows=n_rows):
+            for i, batch in enumerate(read_spool(spool_dir)):
+                with tracer.span(f"batch:{i}", rows=len(batch)) as span:
+                    (logical_batch_indices, logical_batch_row_issues,
+                     dtype_batch_indices, dtype_batch_row_issues) = validate_matched(
+                        batch, matched_cols, pool=validation_pool, pan_counts=pan_counts, tracer=tracer
+                    )
+                    _merge_indices(logical_indices, logical_batch_indices)
+                    logical_row_issues.extend(logical_batch_row_issues)
+                    _merge_indices(dtype_indices, dtype_batch_indices)
+                    dtype_row_issues.extend(dtype_batch_row_issues)
+                    span.set(issues=len(logical_batch_row_issues) + len(dtype_batch_row_issues))
+
+                    with tracer.span("signatures", rows=len(batch), columns=len(columns)):
+                        encoded, signatures = _batch_signatures(batch, columns, common_words, pool)
+                        for col, (_, _, weights), column_signatures in zip(columns, encoded, signatures):
+                            # Rows per signature, summed from the weights of the batch's distinct values
+                            value_codes, batch_signatures = pd.factorize(column_signatures)
+                            ids = signature_ids[col]
+                            lookup = np.array([ids.setdefault(sig, len(ids)) for sig in batch_signatures], dtype=np.int64)
+                            batch_counts = np.bincount(value_codes, weights=weights, minlength=len(batch_signatures))
+                            counts = np.bincount(lookup, weights=batch_counts, minlength=len(ids)).astype(np.int64)
+                            counts[:len(pattern_counts[col])] += pattern_counts[col]
+                            pattern_counts[col] = counts
+
+        # Classify patterns against sheet-wide coverage
+        low_coverage = {}
+        with tracer.span("pattern", rows=n_rows, columns=len(columns)):
+            for col in columns:
+                with tracer.span(f"pattern:{col}", rows=n_rows) as span:
+                    patterns = list(signature_ids[col])
+                    _, low = pattern_coverage(pattern_counts.pop(col), patterns, threshold=1.0)
+                    if low.any():
+                        low_coverage[col] = low
+                    span.set(patterns=len(patterns), issues=int(low.sum()))
+
+        # Last pass: flag the rows of low-coverage patterns
+        flagged_rows = {col: [] for col in low_coverage}
+        flagged = list(low_coverage)
+        with tracer.span("classify", rows=n_rows, columns=len(flagged)):
+            for i, batch in enumerate(read_spool(spool_dir) if flagged else ()):
+                with tracer.span(f"batch:{i}", rows=len(batch)):
+                    encoded, signatures = _batch_signatures(batch, flagged, common_words, pool)
+                    for col, (codes, _, _), column_signatures in zip(flagged, encoded, signatures):
+                        ids = signature_ids[col]
+                        low_values = low_coverage[col][[ids[sig] for sig in column_signatures]]
+                        flagged_rows[col].append(batch.index.to_numpy()[low_values[codes]])
+    pattern_issues = {}
+    pattern_row_issues = {}
+    for col in columns:
+        rows = np.concatenate(flagged_rows[col]) if flagged_rows.get(col) else np.zeros(0, dtype=np.int64)
+        pattern_issues[col] = rows.tolist()
+        pattern_row_issues[col] = coverage_row_issues(rows, threshold=1.0)
+    print("- Pattern Done")
+
+    fill_ratios = {col: non_null[col] / n_rows for col in columns}
+    return (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+            dtype_indices, dtype_row_issues, fill_ratios)
+
+def validate_frame(df, workers=None, split_rows=None, validation_executor="process", tracer=None, result_cache=None,
+                   progress=None):
+    """
+    Run pattern, logical and data type validation on a loaded sheet.
+
+    Args:
+        df (pd.DataFrame): Loaded sheet.
+        workers (int, optional): Number of workers for pattern signatures and validators.
+        split_rows (int, optional): Rows per chunk for map-reduce counting within a column.
+        validation_executor (str): "process" or "thread" pool for the validators.
+        tracer (Tracer, optional): Records "match_cols", "pattern", "validate" and
+            "fill_ratio" spans.
+        result_cache (ResultCache, optional): Per-column results of earlier runs.
+        progress (callable, optional): Receives the "pattern" and "validate" progress
+            of each column.
+
+    Returns:
+        tuple: (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+            dtype_indices, dtype_row_issues, fill_ratios), as from stream_validate.
+    """
+    tracer = Tracer() if tracer is None else tracer
+    n_rows = len(df)
+
+    # Match columns to expected column names
+    with tracer.span("match_cols", columns=len(df.columns)) as span:
+        matched_cols = match_cols(df.columns, EXPECTED_COLS, cache_file=Header_Cache_File)
+        span.set(matched=len(matched_cols))
+    print(f" ---- Matched columns: {matched_cols}")
+    
+    column_hashes = None
+    if result_cache is not None:
+        with tracer.span("column_hash", rows=n_rows, columns=len(df.columns)):
+            column_hashes = {col: column_hash(df[col]) for col in df.columns}
+    
+    # Pattern discovery on all columns, evaluating each distinct value once
+    with tracer.span("pattern", rows=n_rows, columns=len(df.columns)) as span:
+        pattern_issues, pattern_row_issues = discover_patterns(
+            df, workers=workers, split_rows=split_rows, tracer=tracer,
+            result_cache=result_cache, column_hashes=column_hashes, progress=progress
+        )
+        span.set(issues=sum(len(issues) for issues in pattern_issues.values()))
+    
+    print("- Pattern Done")
+    
+    # Logical and data type validation on matched columns, sharing parsed columns
+    with _executor(workers, validation_executor) as validation_pool, \
+            tracer.span("validate", rows=n_rows, columns=len(matched_cols)) as span:
+        (logical_indices, logical_row_issues,
+         dtype_indices, dtype_row_issues) = validate_matched(
+            df, matched_cols, pool=validation_pool, tracer=tracer,
+            result_cache=result_cache, column_hashes=column_hashes, progress=progress
+        )
+        span.set(issues=len(logical_row_issues) + len(dtype_row_issues))
+    print("-- Logical Done")
+    print("--- Data Type Done")
+    
+    # Fill ratio calculation
+    with tracer.span("fill_ratio", rows=n_rows):
+        fill_ratios = {col: 1 - df[col].isna().mean() for col in df.columns}
+    print("---- Fill Ratio Done")
+    return (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+            dtype_indices, dtype_row_issues, fill_ratios)
+
+def write_output(source, results, output_file, n_rows, writer="openpyxl", tracer=None, progress=None):
+    """
+    Write the validation results: a recolored workbook, or an issue report for a
+    .csv or .parquet output path.
+
+    Args:
+        source (pd.DataFrame or iterable): Loaded sheet, or its row batches.
+        results (tuple): Results of validate_frame or stream_validate.
+        output_file (Path): Output path.
+        n_rows (int): Number of rows in ``source``.
+        writer (str): Workbook writer, "openpyxl" or "write_only".
+        tracer (Tracer, optional): Records "colors" and "write" spans.
+        progress (callable, optional): Called as progress("write", done, total) when
+            writing starts and ends.
+
+    Returns:
+        int: Number of flagged cells: rows of an issue report, colored cells of a workbook.
+    """
+    tracer = Tracer() if tracer is None else tracer
+    progress = _no_progress if progress is None else progress
+    progress("write", 0, 1)
+    (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+     dtype_indices, dtype_row_issues, fill_ratios) = results
+
+    # Assign colors based on all issues
+    with tracer.span("colors", rows=n_rows) as span:
+        cell_colors = assign_colors(logical_indices, pattern_issues, dtype_indices, COLORS, PRIORITIES)
+        span.set(cells=len(cell_colors))
+    print("----- Colors Saved")
+    
+    # Apply colors to Excel, add Flag and Issues columns, and freeze them;
+    # streamed runs also write their output in constant memory by default.
+    # A CSV/Parquet output skips the workbook and lists the flagged cells
+    if output_file.suffix.lower() in REPORT_WRITERS:
+        with tracer.span("write", rows=n_rows, writer="report") as span:
+            report = issue_report(logical_row_issues, pattern_row_issues, dtype_row_issues, cell_colors, columns=list(fill_ratios))
+            write_issue_report(report, output_file)
+            span.set(cells=len(report), bytes_written=output_file.stat().st_size)
+        flagged = len(report)
+    else:
+        with tracer.span("write", rows=n_rows, writer=writer) as span:
+            apply_colors_to_excel(source, cell_colors, fill_ratios, output_file, logical_row_issues, pattern_row_issues, dtype_row_issues, writer=writer)
+            span.set(bytes_written=output_file.stat().st_size)
+        flagged = len(cell_colors)
+    progress("write", 1, 1)
+    return flagged
+
+def main(input_file_path: str, output_file_path: str, chunk_size: int = None, writer: str = None, workers: int = None,
+         split_rows: int = None, validation_executor: str = "process", tracer: Tracer = None,
+         memory_budget: int = None, over_budget: str = "stream", result_cache: ResultCache = None,
+         columns: list = None, arrow_strings: bool = False, progress=None) -> str:
+    # Stages and columns are timed as nested spans of ``tracer``; pass a Tracer
+    # to read them back with tracer.profile(), write them as JSON lines, run one
+    # stage under cProfile, or record memory per stage (Tracer(memory=True)).
+    # With a result_cache, columns unchanged since an earlier run reuse its results
+    # (in-memory path only).
+    # Inputs may be .xlsx, .csv or .parquet, optionally reading only ``columns``;
+    # an output path ending in .csv or .parquet gets an issue report (one row per
+    # flagged cell) instead of a recolored workbook. With arrow_strings, text
+    # columns are stored as string[pyarrow] from loading to validation.
+    # progress(stage, done, total, detail) is called as the stages advance: "load",
+    # "pattern" and "validate" per column, then "write" (streamed runs report
+    # whole stages only)
+    tracer = Tracer() if tracer is None else tracer
+    progress = _no_progress if progress is None else progress
+
+    # Validate input file
+    input_file = Path(input_file_path)
+    if not input_file.exists() or not input_file.is_file() or input_file.suffix.lower() not in READERS:
+        print(f"Error: '{input_file}' not found or is not a valid {', '.join(READERS)} file!")
+        return None
+    
+    print(f"Processing file: {input_file}")
+    output_file = Path(output_file_path)
+    
+    # Ensure the output directory exists
+    output_file.parent.mkdir(exist_ok=True)
+    
+    # Memory budget in bytes: if the in-memory path is estimated to exceed it, stop
+    # (over_budget="fail") or stream row batches sized to fit (over_budget="stream")
+    if memory_budget and not chunk_size:
+        estimate, bytes_per_row = estimate_memory(str(input_file), columns=columns, arrow_strings=arrow_strings)
+        if estimate > memory_budget:
+            if over_budget == "fail":
+                print(f"Error: '{input_file}' needs about {estimate / 2**20:.0f} MB, "
+                      f"over the memory budget of {memory_budget / 2**20:.0f} MB!")
+                return None
+            chunk_size = max(1000, int(memory_budget / (bytes_per_row * MEMORY_FACTOR)))
+            print(f"Estimated {estimate / 2**20:.0f} MB is over the memory budget; streaming {chunk_size} rows at a time")
+    
+    with tracer.span("main", input=str(input_file), output=str(output_file)) as run:
+        # The input file is decoded exactly once; the writer reuses the loaded data
+        if chunk_size:
+            # Stream the input in row batches to bound memory on very large sheets
+            spool = tempfile.TemporaryDirectory(prefix="data_issue_spool_")
+            progress("load", 0, 1, input_file.name)
+            results = stream_validate(
+                str(input_file), chunk_size, spool.name, workers=workers, validation_executor=validation_executor,
+                tracer=tracer, usecols=columns, arrow_strings=arrow_strings
+            )
+            progress("validate", 1, 1)
+            source = read_spool(spool.name)
+            n_rows = next(span.attrs["rows"] for span in run.children if span.name == "scan")
+        else:
+            # Load the input file
+            progress("load", 0, 1, input_file.name)
+            with tracer.span("load", bytes_read=input_file.stat().st_size) as span:
+                df = load_table(str(input_file), columns=columns, arrow_strings=arrow_strings)
+                span.set(rows=len(df), columns=len(df.columns))
+                if tracer.memory:
+                    span.set(column_bytes=df.memory_usage(index=False, deep=True).to_dict())
+            print(f" -- Loaded file: {input_file}")
+            progress("load", 1, 1, input_file.name)
+            n_rows = len(df)
+            
+            results = validate_frame(
+                df, workers=workers, split_rows=split_rows, validation_executor=validation_executor,
+                tracer=tracer, result_cache=result_cache, progress=progress
+            )
+            source = df
+        
+        if writer is None:
+            writer = "write_only" if chunk_size else "openpyxl"
+        write_output(source, results, output_file, n_rows, writer=writer, tracer=tracer, progress=progress)
+        if chunk_size:
+            spool.cleanup()
+        run.set(rows=n_rows)
+    
+    return str(output_file)
+
+if __name__ == "__main__":
+    from Config import Input_Folder, Output_Folder, Input_File
+    start_time = time.time()
+    input_file_path = Path(Input_Folder) / Input_File
+    output_file_path = Path(Output_Folder) / f"{input_file_path.stem}_processed.xlsx"
+    from Config import Result_Cache_Folder, Result_Cache_Max_Bytes
+    tracer = Tracer()
+    output_file = main(str(input_file_path), str(output_file_path), tracer=tracer,
+                       result_cache=ResultCache(Result_Cache_Folder, Result_Cache_Max_Bytes))
+    total = time.time() - start_time
+    print(tracer.profile())
+    print(f"--- Processed in {total} seconds ---")
+    if output_file:
         print(f"Output saved to: {output_file}")
\ No newline at end of file
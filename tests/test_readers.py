@@ -0,0 +1,64 @@
+"""The .xlsx, .csv and .parquet readers give the same cells, and so the same issues."""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from Config import COLORS, PRIORITIES
+from Excel_Handler import assign_colors, issue_report
+from Text_PreProc import iter_table, load_table
+from main import validate_frame
+from synthetic import generate, write_workbook
+
+ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    # One synthetic sheet, with blank and whitespace-only cells, saved in every input format
+    directory = tmp_path_factory.mktemp("inputs")
+    df = generate(ROWS, seed=1)
+    df.loc[::97, "Notes"] = "   "
+    df.loc[::89, "Name"] = "NA"
+    paths = {suffix: directory / f"sheet{suffix}" for suffix in (".xlsx", ".csv", ".parquet")}
+    write_workbook(df, paths[".xlsx"])
+    df.to_csv(paths[".csv"], index=False)
+    df.to_parquet(paths[".parquet"], index=False)
+    return paths
+
+
+def _report(df):
+    (pattern_issues, pattern_row_issues, logical_indices, logical_row_issues,
+     dtype_indices, dtype_row_issues, fill_ratios) = validate_frame(df)
+    cell_colors = assign_colors(logical_indices, pattern_issues, dtype_indices, COLORS, PRIORITIES)
+    return issue_report(logical_row_issues, pattern_row_issues, dtype_row_issues, cell_colors, columns=list(fill_ratios))
+
+
+@pytest.fixture(autouse=True)
+def _header_cache(tmp_path, monkeypatch):
+    # Keep the header match cache out of the working tree
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize("arrow_strings", [False, True])
+def test_same_issue_report_for_every_format(inputs, arrow_strings):
+    reports = {suffix: _report(load_table(str(path), arrow_strings=arrow_strings)) for suffix, path in inputs.items()}
+    expected = reports[".xlsx"]
+    assert len(expected)
+    for suffix, report in reports.items():
+        pd.testing.assert_frame_equal(report, expected, obj=f"{suffix} report")
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_blank_cells_are_missing(inputs, suffix):
+    df = load_table(str(inputs[suffix]))
+    assert df["Notes"].iloc[::97].isna().all()
+    assert df["Name"].iloc[::89].isna().all()
+    batches = pd.concat(iter_table(str(inputs[suffix]), chunk_size=300))
+    pd.testing.assert_frame_equal(batches, df)